@@ -0,0 +1,99 @@
+"""
+Admission control for a worker's request handlers
+
+At most max_concurrency requests run at once. Up to max_queue more wait in
+arrival order for a free slot, each for at most queue_timeout seconds. Anything
+beyond that is rejected immediately, so under a burst the admitted requests
+keep their latency and the rest get a fast answer they can retry, instead of
+every request slowing down until clients time out.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class Rejected(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency, max_queue, queue_timeout):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.peak_queue = 0
+        self.queue_wait_seconds = 0.0
+        self.rejected = {"queue_full": 0, "queue_timeout": 0}
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue if needed; raises Rejected"""
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise Rejected("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        self.peak_queue = max(self.peak_queue, len(self._waiters))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected["queue_timeout"] += 1
+            raise Rejected("queue_timeout") from None
+        finally:
+            self.queue_wait_seconds += time.monotonic() - started
+        self.admitted += 1
+
+    def release(self):
+        """Free a slot, handing it straight to the longest-waiting request if any"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def retry_after(self):
+        """Seconds a rejected client should wait before retrying"""
+        return max(1, round(self.queue_timeout))
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": len(self._waiters),
+            "peak_queue_depth": self.peak_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "avg_queue_wait_ms": round(1000 * self.queue_wait_seconds / self.queued, 2) if self.queued else 0.0,
+            "rejected": dict(self.rejected),
+        }
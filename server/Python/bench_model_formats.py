@@ -0,0 +1,85 @@
+"""
+Compare the joblib pickle and native CatBoost model formats
+
+Reports cold load time (fresh interpreter, including imports), warm load time
+and batch predict latency per thread count.
+
+Run from the server directory after training:
+    python Python/bench_model_formats.py --threads 1 4
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+import hotel_data
+import hotel_features
+
+MODEL_DIR = "ML/modelforHotels"
+
+LOADERS = {
+    "pickle": (
+        "import joblib",
+        f"joblib.load('{MODEL_DIR}/hotel_price_model.pkl')",
+    ),
+    "cbm": (
+        "from catboost import CatBoostRegressor",
+        f"CatBoostRegressor().load_model('{MODEL_DIR}/hotel_price_model.cbm', format='cbm')",
+    ),
+}
+
+
+def cold_load_seconds(fmt):
+    """Import plus load in a new interpreter, as a fresh worker would do"""
+    setup, load = LOADERS[fmt]
+    code = f"import time; t = time.perf_counter(); {setup}; {load}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def warm_load(fmt, repeat):
+    setup, load = LOADERS[fmt]
+    exec(setup, globals())
+    timings = []
+    model = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model = eval(load)
+        timings.append(time.perf_counter() - start)
+    return model, statistics.median(timings)
+
+
+def predict_latency_ms(model, features, threads, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict(features, thread_count=threads)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 50, 500, 5000])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    df = hotel_data.load_hotels_dataset(hotel_data.DEFAULT_DATASET_PATH)
+    features = hotel_features.build_feature_frame(df)
+
+    for fmt in LOADERS:
+        model, warm = warm_load(fmt, args.repeat)
+        print(f"[{fmt}] cold load {cold_load_seconds(fmt) * 1000:.1f} ms, warm load {warm * 1000:.1f} ms")
+        for size in args.batch_sizes:
+            batch = features.sample(size, replace=size > len(features), random_state=0)
+            row = ", ".join(
+                f"{threads} thr {predict_latency_ms(model, batch, threads, args.repeat):.2f} ms"
+                for threads in args.threads
+            )
+            print(f"[{fmt}]   batch {size:>5}: {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Measure API cold start and fail when it exceeds a budget
+
+Reports how long `import main` takes in a fresh interpreter (from
+`python -X importtime`, with the heaviest modules it pulls in), then starts
+uvicorn and times the first response and the point where /health reports the
+data as loaded. Exits with status 1 if a measurement is over its budget, so it
+can run as a regression check in CI.
+
+Run from the server directory:
+    python Python/check_startup.py
+    python Python/check_startup.py --import-budget-ms 1500 --first-response-budget-ms 3000
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times():
+    """(module, self us, cumulative us, depth) for every import main triggers, in importtime order"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=os.getcwd(), env={**os.environ, "PYTHONPATH": APP_DIR}, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main_import_report(rows, top):
+    """Cumulative import time of main and its heaviest direct imports"""
+    position = max(i for i, row in enumerate(rows) if row[0] == "main" and row[3] == 0)
+    start = max([i for i, row in enumerate(rows[:position]) if row[3] == 0], default=-1) + 1
+    children = [row for row in rows[start:position] if row[3] == 1]
+    children.sort(key=lambda row: row[2], reverse=True)
+    return rows[position][2] / 1000, [(name, cumulative / 1000) for name, _, cumulative, _ in children[:top]]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_server_start(timeout):
+    """Seconds from launching uvicorn to the first HTTP response and to /health returning 200"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", APP_DIR, "--port", str(port),
+         "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_response = ready = None
+    try:
+        while time.perf_counter() - started < timeout and ready is None:
+            try:
+                with urllib.request.urlopen(url, timeout=1):
+                    ready = time.perf_counter() - started
+            except urllib.error.HTTPError:
+                # 503 while the data is still loading
+                pass
+            except OSError:
+                time.sleep(0.02)
+                continue
+            if first_response is None:
+                first_response = time.perf_counter() - started
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait()
+    return first_response, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 1500)))
+    parser.add_argument("--first-response-budget-ms", type=float,
+                        default=float(os.getenv("FIRST_RESPONSE_BUDGET_MS", 3000)))
+    parser.add_argument("--ready-budget-ms", type=float, default=float(os.getenv("READY_BUDGET_MS", 0)),
+                        help="budget until /health is 200 (0 = report only; depends on Mongo and data size)")
+    parser.add_argument("--top", type=int, default=10, help="number of heaviest imports to list")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    import_ms, heaviest = main_import_report(import_times(), args.top)
+    print(f"import main: {import_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    for name, ms in heaviest:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    first_response, ready = time_server_start(args.timeout)
+    first_ms = first_response * 1000 if first_response is not None else float("inf")
+    ready_ms = ready * 1000 if ready is not None else float("inf")
+    print(f"first response: {first_ms:.0f} ms (budget {args.first_response_budget_ms:.0f} ms)")
+    print(f"ready: {ready_ms:.0f} ms" + (f" (budget {args.ready_budget_ms:.0f} ms)" if args.ready_budget_ms else ""))
+
+    over = [
+        label for label, value, budget in [
+            ("import", import_ms, args.import_budget_ms),
+            ("first response", first_ms, args.first_response_budget_ms),
+            ("ready", ready_ms, args.ready_budget_ms),
+        ]
+        if budget and value > budget
+    ]
+    if over:
+        print(f"❌ Over budget: {', '.join(over)}")
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
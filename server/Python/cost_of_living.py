@@ -0,0 +1,204 @@
+"""
+Trip budget estimates from the cost-of-living table and hotel price stats
+
+The Numbeo table written by CostOfLivingScraper is loaded once into a
+country-indexed float frame holding the prices a traveller pays day to day.
+Each travel style is a basket: how many of each item a traveller buys per day
+and which hotel price quantile they stay at. Budgets for a whole batch of trips
+are then one matrix product plus a few column operations.
+"""
+import numpy as np
+import pandas as pd
+
+from currency import BASE_CURRENCY, COUNTRY_CURRENCIES
+from destinations import ALIAS_GROUPS, fold
+
+DEFAULT_COST_OF_LIVING_PATH = "cost_of_living_dataset.csv"
+
+# Daily quantity of each item per traveller, grouped into budget categories
+BASKET_ITEMS = {
+    "food": ["Meal_Inexpensive_Restaurant_USD", "Meal_for_2_Mid_Range_Restaurant_USD", "McMeal_at_McDonalds_USD",
+             "Water_1_5L_USD"],
+    "transport": ["One_way_Ticket_Local_Transport_USD", "Taxi_Start_Normal_Tariff_USD", "Taxi_1km_Normal_Tariff_USD"],
+    "extras": ["Cappuccino_USD", "Domestic_Beer_0_5L_USD", "Bottle_of_Wine_Mid_Range_USD",
+               "Cinema_International_Release_USD"],
+}
+ITEMS = [item for items in BASKET_ITEMS.values() for item in items]
+
+TRAVEL_STYLES = {
+    "budget": {
+        "hotel_quantile": "p10",
+        "Meal_Inexpensive_Restaurant_USD": 1, "McMeal_at_McDonalds_USD": 1, "Water_1_5L_USD": 1,
+        "One_way_Ticket_Local_Transport_USD": 4,
+        "Cappuccino_USD": 1,
+    },
+    "mid": {
+        "hotel_quantile": "median",
+        "Meal_Inexpensive_Restaurant_USD": 1, "Meal_for_2_Mid_Range_Restaurant_USD": 0.5, "Water_1_5L_USD": 1,
+        "One_way_Ticket_Local_Transport_USD": 2, "Taxi_Start_Normal_Tariff_USD": 1, "Taxi_1km_Normal_Tariff_USD": 5,
+        "Cappuccino_USD": 2, "Domestic_Beer_0_5L_USD": 1, "Cinema_International_Release_USD": 0.2,
+    },
+    "luxury": {
+        "hotel_quantile": "p90",
+        "Meal_for_2_Mid_Range_Restaurant_USD": 1.5, "Water_1_5L_USD": 1,
+        "Taxi_Start_Normal_Tariff_USD": 3, "Taxi_1km_Normal_Tariff_USD": 20,
+        "Cappuccino_USD": 2, "Bottle_of_Wine_Mid_Range_USD": 0.5, "Cinema_International_Release_USD": 0.3,
+    },
+}
+STYLES = list(TRAVEL_STYLES)
+
+# Two travellers share a room
+TRAVELLERS_PER_ROOM = 2
+
+
+# Columns that are not numbers
+TEXT_COLUMNS = ["Country", "Scraped_Date", "Source"]
+
+# Numbeo quotes these countries in USD instead of the local currency
+QUOTED_IN_USD = {"Argentina", "Cambodia", "Myanmar"}
+
+
+def load_cost_of_living(rate_table, path=DEFAULT_COST_OF_LIVING_PATH):
+    """
+    Country-indexed numeric frame of the whole cost-of-living table, with
+    "N/A" as NaN.
+
+    Despite the _USD suffix the scraper stores Numbeo's local-currency prices,
+    so every _USD column is converted with the rate table. Countries without a
+    known currency keep NaN prices.
+    """
+    df = pd.read_csv(path, na_values=["N/A", "NA", ""], keep_default_na=False)
+    df = df.drop_duplicates("Country", keep="last")
+    numeric = [col for col in df.columns if col not in TEXT_COLUMNS]
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce").astype("float64")
+
+    currencies = [
+        BASE_CURRENCY if country in QUOTED_IN_USD else COUNTRY_CURRENCIES.get(country)
+        for country in df["Country"]
+    ]
+    factors = rate_table.convert(np.ones(len(df)), currencies, BASE_CURRENCY)
+    prices = [col for col in numeric if col.endswith("_USD")]
+    df[prices] = df[prices].mul(factors, axis=0)
+    df.index = pd.Index([fold(country) for country in df["Country"]], name="country_key")
+    return df
+
+
+def country_keys(index):
+    """Folded country name -> table key, so alternate names ("USA", "UK") match the spelling the table uses"""
+    keys = {key: key for key in index}
+    for group in ALIAS_GROUPS:
+        present = [name for name in group if name in keys]
+        for name in group:
+            if present:
+                keys.setdefault(name, present[0])
+    return keys
+
+
+class TripBudgetEstimator:
+    def __init__(self, table):
+        # Countries without any basket prices are left out; isolated gaps use the cross-country median
+        table = table.dropna(subset=ITEMS, how="all")
+        self.table = table
+        self._items = table[ITEMS].fillna(table[ITEMS].median()).to_numpy()
+        self._basket = np.array([[TRAVEL_STYLES[s].get(item, 0) for item in ITEMS] for s in STYLES])
+        # items x categories indicator, so spend @ categories sums each category
+        self._categories = np.column_stack([np.isin(ITEMS, items) for items in BASKET_ITEMS.values()]).astype(float)
+        self._keys = country_keys(table.index)
+
+    def __len__(self):
+        return len(self.table)
+
+    def country_name(self, country):
+        key = self._keys.get(fold(country))
+        return None if key is None else self.table.at[key, "Country"]
+
+    def estimate(self, trips, hotel_prices):
+        """
+        Daily and total costs (USD) for a frame of trips with columns country,
+        days, style and travellers, plus a hotel_prices frame (same index) of
+        nightly p10/median/p90 room prices. Missing inputs give NaN.
+        """
+        rows = self.table.index.get_indexer([self._keys.get(fold(c), "") for c in trips["country"]])
+        styles = pd.Index(STYLES).get_indexer(trips["style"])
+        found = rows >= 0
+
+        # Per-traveller daily spend on each item, then per category
+        spend = np.full((len(trips), len(ITEMS)), np.nan)
+        spend[found] = self._items[rows[found]] * self._basket[styles[found]]
+        travellers = trips["travellers"].to_numpy(dtype=float)
+        days = trips["days"].to_numpy(dtype=float)
+        categories = (spend @ self._categories) * travellers[:, None]
+        result = pd.DataFrame(categories, index=trips.index, columns=list(BASKET_ITEMS))
+
+        quantile = np.array([TRAVEL_STYLES[s]["hotel_quantile"] for s in STYLES])[styles]
+        nightly = np.choose(
+            pd.Index(["p10", "median", "p90"]).get_indexer(quantile),
+            [hotel_prices[q].to_numpy(dtype=float) for q in ("p10", "median", "p90")],
+        )
+        result["accommodation"] = nightly * np.ceil(travellers / TRAVELLERS_PER_ROOM)
+        result["daily_total"] = result[list(BASKET_ITEMS) + ["accommodation"]].sum(axis=1, skipna=False)
+        result["total"] = result["daily_total"] * days
+        return result
+
+
+class CostOfLivingRanking:
+    """
+    Sorted views of every numeric column, computed once at load.
+
+    Each column keeps the row order that sorts it (NaN rows dropped) and the
+    sorted values, so a range filter is two binary searches and top-k is a
+    slice of the order.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.columns = [col for col in table.columns if col not in TEXT_COLUMNS]
+        self._order = {}
+        self._sorted = {}
+        for col in self.columns:
+            values = table[col].to_numpy()
+            order = np.argsort(values, kind="stable")
+            order = order[:int((~np.isnan(values)).sum())]
+            self._order[col] = order
+            self._sorted[col] = values[order]
+        self._by_country = np.argsort(table["Country"].to_numpy(dtype=str), kind="stable")
+        self._rows = {name: table.index.get_loc(key) for name, key in country_keys(table.index).items()}
+
+    def __len__(self):
+        return len(self.table)
+
+    def range_rows(self, column, low=None, high=None):
+        """Row positions with low <= value <= high, in ascending value order"""
+        values = self._sorted[column]
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return self._order[column][start:stop]
+
+    def query(self, sort=None, descending=False, ranges=None, countries=None, limit=20, offset=0):
+        """
+        Rows matching every {column: (low, high)} range and, if given, one of
+        the countries, ordered by sort (default Country). Rows without a value
+        for the sort column are left out. Returns (row positions for the
+        requested page, total matches).
+        """
+        ranges = ranges or {}
+        if sort is None or sort == "Country":
+            rows = self._by_country
+        else:
+            rows = self.range_rows(sort, *ranges.get(sort, (None, None)))
+        if descending:
+            rows = rows[::-1]
+
+        keep = np.ones(len(self.table), dtype=bool)
+        for column, (low, high) in ranges.items():
+            if column == sort:
+                continue
+            in_range = np.zeros(len(self.table), dtype=bool)
+            in_range[self.range_rows(column, low, high)] = True
+            keep &= in_range
+        if countries is not None:
+            wanted = np.zeros(len(self.table), dtype=bool)
+            wanted[[self._rows[fold(c)] for c in countries if fold(c) in self._rows]] = True
+            keep &= wanted
+        rows = rows[keep[rows]]
+        return rows[offset:offset + limit], len(rows)
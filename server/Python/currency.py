@@ -0,0 +1,195 @@
+"""
+Currency conversion from a locally cached rate table
+
+Rates are units of each currency per USD, kept in data/exchange_rates.json so
+the API never calls out on a request path. The table can be refreshed from a
+rates URL or, offline, from another JSON file with the same layout:
+
+    python Python/currency.py refresh --url https://open.er-api.com/v6/latest/USD
+    python Python/currency.py refresh --from-file rates.json
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATES_PATH = "data/exchange_rates.json"
+BASE_CURRENCY = "USD"
+
+
+# Local currency per country, for sources that quote prices locally
+_EURO_COUNTRIES = [
+    "Austria", "Belgium", "Croatia", "Estonia", "Finland", "France", "Germany", "Greece", "Ireland", "Italy",
+    "Latvia", "Lithuania", "Luxembourg", "Malta", "Montenegro", "Netherlands", "Portugal", "Slovakia",
+    "Slovenia", "Spain",
+]
+COUNTRY_CURRENCIES = {
+    **{country: "EUR" for country in _EURO_COUNTRIES},
+    "Albania": "ALL", "Argentina": "ARS", "Australia": "AUD", "Bahrain": "BHD", "Bangladesh": "BDT",
+    "Belarus": "BYN", "Bolivia": "BOB", "Bosnia and Herzegovina": "BAM", "Brazil": "BRL", "Bulgaria": "BGN",
+    "Cambodia": "KHR", "Canada": "CAD", "Chile": "CLP", "China": "CNY", "Colombia": "COP", "Costa Rica": "CRC",
+    "Czech Republic": "CZK", "Denmark": "DKK", "Ecuador": "USD", "Fiji": "FJD", "Guyana": "GYD",
+    "Hong Kong": "HKD", "Hungary": "HUF", "Iceland": "ISK", "India": "INR", "Indonesia": "IDR", "Israel": "ILS",
+    "Japan": "JPY", "Jordan": "JOD", "Kuwait": "KWD", "Laos": "LAK", "Lebanon": "LBP", "Macau": "MOP",
+    "Malaysia": "MYR", "Maldives": "MVR", "Mexico": "MXN", "Myanmar": "MMK", "Nepal": "NPR",
+    "New Zealand": "NZD", "North Macedonia": "MKD", "Norway": "NOK", "Pakistan": "PKR", "Panama": "PAB",
+    "Paraguay": "PYG", "Peru": "PEN", "Philippines": "PHP", "Poland": "PLN", "Qatar": "QAR", "Romania": "RON",
+    "Russia": "RUB", "Saudi Arabia": "SAR", "Serbia": "RSD", "Singapore": "SGD", "South Africa": "ZAR",
+    "South Korea": "KRW", "Sri Lanka": "LKR", "Suriname": "SRD", "Sweden": "SEK", "Switzerland": "CHF",
+    "Taiwan": "TWD", "Thailand": "THB", "Turkey": "TRY", "Ukraine": "UAH", "United Arab Emirates": "AED",
+    "United Kingdom": "GBP", "United States": "USD", "USA": "USD", "Uruguay": "UYU", "Venezuela": "VES",
+    "Vietnam": "VND",
+}
+
+
+class UnknownCurrency(ValueError):
+    pass
+
+
+def normalize_code(code):
+    return str(code or "").strip().upper()
+
+
+class RateTable:
+    def __init__(self, path=DEFAULT_RATES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.rates = pd.Series({BASE_CURRENCY: 1.0})
+        self.updated = None
+        self.source = None
+        self._mtime = None
+        # Bumped on every load, for response validators
+        self.version = 0
+
+    def load(self):
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            table = json.load(f)
+        self._apply(table)
+        self._mtime = mtime
+        logger.info(f"✅ Exchange rates loaded: {len(self.rates)} currencies (updated {self.updated})")
+        return self
+
+    def _apply(self, table):
+        rates = validate_table(table)
+        with self._lock:
+            self.rates = pd.Series(rates, dtype=float)
+            self.updated = table.get("updated")
+            self.source = table.get("source")
+            self.version += 1
+
+    def reload_if_changed(self):
+        """Pick up a refreshed rate file without restarting the API"""
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.load()
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Exchange rate reload failed, keeping current rates: {e}")
+
+    def currencies(self):
+        return sorted(self.rates.index)
+
+    def rate(self, code):
+        """Units of code per USD"""
+        code = normalize_code(code)
+        if code not in self.rates.index:
+            raise UnknownCurrency(code)
+        return float(self.rates[code])
+
+    def factor(self, from_code, to_code):
+        """Multiplier taking an amount in from_code to to_code"""
+        return self.rate(to_code) / self.rate(from_code)
+
+    def convert(self, amounts, from_codes, to_code):
+        """
+        Convert a column of amounts, each in its own currency, to to_code in one
+        vectorized step. Missing amounts and unknown source currencies give NaN.
+        """
+        to_rate = self.rate(to_code)
+        amounts = pd.to_numeric(pd.Series(amounts, dtype=object), errors="coerce").to_numpy(dtype=float)
+        if isinstance(from_codes, str):
+            from_rates = self.rate(from_codes)
+        else:
+            codes = pd.Series(from_codes, dtype="string").str.strip().str.upper()
+            from_rates = codes.map(self.rates).to_numpy(dtype=float, na_value=np.nan)
+        return amounts * (to_rate / from_rates)
+
+    def stats(self):
+        return {"currencies": len(self.rates), "updated": self.updated, "source": self.source}
+
+
+def validate_table(table):
+    """Rates per USD from a rate file or API payload; raises ValueError if unusable"""
+    base = normalize_code(table.get("base") or table.get("base_code") or BASE_CURRENCY)
+    rates = table.get("rates")
+    if not isinstance(rates, dict) or not rates:
+        raise ValueError("rate table has no rates")
+    rates = {normalize_code(code): float(value) for code, value in rates.items()}
+    if base != BASE_CURRENCY:
+        # Rebase so every rate is per USD
+        if BASE_CURRENCY not in rates:
+            raise ValueError(f"cannot rebase rates from {base} without a {BASE_CURRENCY} rate")
+        usd = rates[BASE_CURRENCY]
+        rates = {code: value / usd for code, value in rates.items()}
+        rates[base] = 1.0 / usd
+    rates[BASE_CURRENCY] = 1.0
+    bad = [code for code, value in rates.items() if not np.isfinite(value) or value <= 0]
+    if bad:
+        raise ValueError(f"invalid rates for {', '.join(sorted(bad))}")
+    return rates
+
+
+def refresh(path=DEFAULT_RATES_PATH, url=None, from_file=None, timeout=10):
+    """Replace the rate file from a URL or a local JSON file; returns the number of currencies"""
+    if from_file:
+        with open(from_file, encoding="utf-8") as f:
+            table = json.load(f)
+        source = os.path.basename(from_file)
+    else:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            table = json.load(response)
+        source = url
+    rates = validate_table(table)
+    payload = {
+        "base": BASE_CURRENCY,
+        "updated": datetime.now().strftime("%Y-%m-%d"),
+        "source": source,
+        "rates": dict(sorted(rates.items(), key=lambda item: (item[0] != BASE_CURRENCY, item[0]))),
+    }
+    # Write then rename so a running API never reads a half-written file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+    return len(rates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the cached exchange rate table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    refresh_parser = sub.add_parser("refresh", help="Replace the rate table")
+    refresh_parser.add_argument("--path", default=DEFAULT_RATES_PATH)
+    source = refresh_parser.add_mutually_exclusive_group()
+    source.add_argument("--url", default=os.getenv("EXCHANGE_RATES_URL"))
+    source.add_argument("--from-file", help="JSON file with 'base' and 'rates' (works offline)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.url and not args.from_file:
+        parser.error("give --url, --from-file or set EXCHANGE_RATES_URL")
+    count = refresh(args.path, url=args.url, from_file=args.from_file)
+    logger.info(f"✅ Saved {count} exchange rates to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+End-to-end latency budget for a request
+
+A Deadline starts when the request does. Each stage waits at most the time
+that is left, and a stage that runs out marks itself degraded so the response
+can say which parts are incomplete instead of waiting on a slow dependency.
+"""
+import threading
+import time
+
+
+class Deadline:
+    def __init__(self, seconds=None):
+        """seconds=None means no budget: remaining() is None and nothing times out"""
+        self.expires = None if seconds is None else time.monotonic() + seconds
+        self.degraded = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        """Seconds left (never negative), or None without a budget"""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def mark(self, stage):
+        """Record that stage gave up or failed, once per stage"""
+        with self._lock:
+            if stage not in self.degraded:
+                self.degraded.append(stage)
@@ -0,0 +1,182 @@
+"""
+Destination index for autocomplete and forgiving country/city lookup
+
+Country and city names are folded (case, accents, punctuation) and indexed two
+ways: a sorted list of name and word keys answers prefix queries with a binary
+search, and a trigram index finds near-matches for misspellings. Known alternate
+names ("USA", "Kiev", "Bombay") resolve to whichever spelling the dataset uses;
+misspellings are only suggested, never silently replaced.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Names that refer to the same place; the spelling present in the data is canonical
+ALIAS_GROUPS = [
+    {"usa", "united states", "united states of america", "us", "america"},
+    {"united kingdom", "uk", "great britain", "britain", "england"},
+    {"united arab emirates", "uae"},
+    {"south korea", "korea", "republic of korea"},
+    {"czech republic", "czechia"},
+    {"turkey", "turkiye"},
+    {"myanmar", "burma"},
+    {"north macedonia", "macedonia"},
+    {"netherlands", "holland"},
+    {"kyiv", "kiev"},
+    {"delhi", "new delhi"},
+    {"mumbai", "bombay"},
+    {"chennai", "madras"},
+    {"kolkata", "calcutta"},
+    {"bangalore", "bengaluru"},
+    {"ho chi minh city", "saigon", "hcmc"},
+    {"beijing", "peking"},
+]
+
+MIN_SIMILARITY = 0.45
+
+
+def fold(text):
+    """Lowercase, strip accents and punctuation: "São Paulo" -> "sao paulo" """
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^\w\s]", " ", text.casefold())
+    return " ".join(text.split())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Destination:
+    kind: str  # "country" or "city"
+    name: str
+    country: str
+    hotels: int
+
+    def as_dict(self):
+        return {"type": self.kind, "name": self.name, "country": self.country, "hotels": self.hotels}
+
+
+class DestinationIndex:
+    def __init__(self, destinations):
+        """
+        Args:
+            destinations: iterable of (country, city, hotel count)
+        """
+        country_hotels = defaultdict(int)
+        self.entries = []
+        for country, city, hotels in destinations:
+            country_hotels[country] += hotels
+            self.entries.append(Destination("city", city, country, hotels))
+        self.entries.extend(Destination("country", c, c, n) for c, n in country_hotels.items())
+
+        # folded key -> entry ids, per kind
+        self._exact = {"country": defaultdict(list), "city": defaultdict(list)}
+        self._trigrams = defaultdict(set)
+        self._entry_trigrams = []
+        prefix_keys = []
+        for i, entry in enumerate(self.entries):
+            key = fold(entry.name)
+            self._exact[entry.kind][key].append(i)
+            grams = trigrams(key)
+            self._entry_trigrams.append(grams)
+            for gram in grams:
+                self._trigrams[gram].add(i)
+            # Every word start is searchable, so "lumpur" finds "Kuala Lumpur"
+            words = key.split()
+            for w in range(len(words)):
+                prefix_keys.append((" ".join(words[w:]), w, i))
+
+        for group in ALIAS_GROUPS:
+            for kind, exact in self._exact.items():
+                targets = [i for name in group for i in exact.get(name, ())]
+                for alias in group:
+                    if targets and alias not in exact:
+                        exact[alias] = targets
+                        prefix_keys.extend((alias, 0, i) for i in targets)
+
+        prefix_keys.sort()
+        self._prefix_keys = [key for key, _, _ in prefix_keys]
+        self._prefix_entries = [(word, i) for _, word, i in prefix_keys]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _rank(self, ids):
+        # Countries before cities, then busier destinations first
+        return sorted(ids, key=lambda i: (self.entries[i].kind != "country", -self.entries[i].hotels, self.entries[i].name))
+
+    def prefix(self, text, limit=10):
+        key = fold(text)
+        if not key:
+            return []
+        start = bisect_left(self._prefix_keys, key)
+        whole_name, word_match = [], []
+        seen = set()
+        for pos in range(start, len(self._prefix_keys)):
+            if not self._prefix_keys[pos].startswith(key):
+                break
+            word, i = self._prefix_entries[pos]
+            if i not in seen:
+                seen.add(i)
+                (whole_name if word == 0 else word_match).append(i)
+        return [self.entries[i] for i in (self._rank(whole_name) + self._rank(word_match))[:limit]]
+
+    def fuzzy(self, text, kind=None, limit=10, min_similarity=MIN_SIMILARITY, country=None):
+        """Entries sharing enough trigrams with text, best first"""
+        key = fold(text)
+        if not key:
+            return []
+        grams = trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for i in self._trigrams.get(gram, ()):
+                shared[i] += 1
+        scored = []
+        for i, n in shared.items():
+            entry = self.entries[i]
+            if (kind and entry.kind != kind) or (country and fold(entry.country) != fold(country)):
+                continue
+            similarity = 2 * n / (len(grams) + len(self._entry_trigrams[i]))
+            if similarity >= min_similarity:
+                scored.append((-similarity, -entry.hotels, i))
+        scored.sort()
+        return [self.entries[i] for _, _, i in scored[:limit]]
+
+    def autocomplete(self, text, limit=10):
+        """Prefix matches, topped up with near-matches for misspelled input"""
+        results = self.prefix(text, limit)
+        if len(results) < limit and len(fold(text)) >= 3:
+            seen = set(results)
+            results += [e for e in self.fuzzy(text, limit=limit) if e not in seen][:limit - len(results)]
+        return results
+
+    def resolve(self, text, kind, country=None):
+        """
+        The indexed destination name text refers to by exact (folded) name or
+        known alias, or None. Near-matches are never substituted; see suggest().
+        For cities, a match inside country is preferred when one is given.
+        """
+        ids = self._exact[kind].get(fold(text))
+        if not ids:
+            return None
+        candidates = [self.entries[i] for i in ids]
+        if country:
+            in_country = [e for e in candidates if fold(e.country) == fold(country)]
+            candidates = in_country or candidates
+        return max(candidates, key=lambda e: e.hotels).name
+
+    def suggest(self, text, kind, country=None, limit=3):
+        """Close near-matches for a name that didn't resolve, best first, those inside country first"""
+        matches = []
+        if country:
+            matches = self.fuzzy(text, kind=kind, limit=limit, country=country)
+        matches += [
+            e for e in self.fuzzy(text, kind=kind, limit=limit)
+            if e not in matches
+        ]
+        return matches[:limit]
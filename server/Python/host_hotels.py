@@ -0,0 +1,206 @@
+"""
+In-memory mirror of the host hotels stored in MongoDB (Bagragi.hotels)
+
+Host hotels change rarely, so the service can keep them in memory, indexed by
+country and (country, city), and serve reads without touching Mongo. After the
+initial load, writes are applied from a change stream. Deployments without
+change streams (standalone mongod) fall back to periodic polling.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Server error codes meaning change streams are unavailable on this deployment
+CHANGE_STREAM_UNSUPPORTED = {40573, 40324}
+
+
+def location_key(value):
+    return str(value or "").strip().lower()
+
+
+class HostHotelMirror:
+    def __init__(self, collection, poll_interval=5.0):
+        """
+        Args:
+            collection: pymongo collection holding host hotels
+            poll_interval (float): Seconds between full resyncs when change streams are unavailable
+        """
+        self.collection = collection
+        self.poll_interval = poll_interval
+        self._docs = {}
+        self._by_country = defaultdict(set)
+        self._by_city = defaultdict(set)
+        self._by_city_name = defaultdict(set)
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.listeners = []
+        self.mode = None
+        self.version = 0
+        self.changes_applied = 0
+        self.last_sync = None
+        self.loaded = False
+
+    # --------- INDEX MAINTENANCE ---------
+    def _index(self, doc):
+        location = doc.get("location") or {}
+        return location_key(location.get("country")), location_key(location.get("city"))
+
+    def _upsert(self, doc):
+        doc_id = doc["_id"]
+        with self._lock:
+            old = self._docs.get(doc_id)
+            if old is not None:
+                self._unindex(doc_id, old)
+            self._docs[doc_id] = doc
+            country, city = self._index(doc)
+            self._by_country[country].add(doc_id)
+            self._by_city[(country, city)].add(doc_id)
+            self._by_city_name[city].add(doc_id)
+            self.version += 1
+        return old, doc
+
+    def _remove(self, doc_id):
+        with self._lock:
+            old = self._docs.pop(doc_id, None)
+            if old is None:
+                return None
+            self._unindex(doc_id, old)
+            self.version += 1
+        return old, None
+
+    def _unindex(self, doc_id, doc):
+        country, city = self._index(doc)
+        self._by_country[country].discard(doc_id)
+        self._by_city[(country, city)].discard(doc_id)
+        self._by_city_name[city].discard(doc_id)
+
+    def _notify(self, changes):
+        """Pass (old, new) pairs to every listener, one call per batch of writes"""
+        changes = [change for change in changes if change is not None]
+        if not changes:
+            return
+        for listener in self.listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                logger.error(f"Host hotel listener failed: {e}")
+
+    # --------- SYNC ---------
+    def resync(self):
+        """Reload the collection and apply the differences to the mirror"""
+        docs = {doc["_id"]: doc for doc in self.collection.find({})}
+        with self._lock:
+            removed = [doc_id for doc_id in self._docs if doc_id not in docs]
+            changed = [doc for doc_id, doc in docs.items() if self._docs.get(doc_id) != doc]
+        self._notify([self._remove(doc_id) for doc_id in removed] + [self._upsert(doc) for doc in changed])
+        self.changes_applied += len(removed) + len(changed) if self.loaded else 0
+        self.last_sync = time.time()
+        self.loaded = True
+
+    def apply_change(self, change):
+        """Apply one change stream event"""
+        operation = change.get("operationType")
+        if operation in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc is None:
+                # Deleted again before the lookup ran
+                self._notify([self._remove(change["documentKey"]["_id"])])
+            else:
+                self._notify([self._upsert(doc)])
+        elif operation == "delete":
+            self._notify([self._remove(change["documentKey"]["_id"])])
+        elif operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            self.resync()
+            return
+        self.changes_applied += 1
+        self.last_sync = time.time()
+
+    def _watch(self):
+        with self.collection.watch(full_document="updateLookup", max_await_time_ms=1000) as stream:
+            self.mode = "change_stream"
+            # Catch writes that happened between the initial load and opening the stream
+            self.resync()
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is not None:
+                    self.apply_change(change)
+                else:
+                    self.last_sync = time.time()
+
+    def _poll(self):
+        self.mode = "polling"
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.resync()
+            except PyMongoError as e:
+                logger.error(f"Host hotel poll failed: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED:
+                    logger.info("Change streams unavailable, polling host hotels instead")
+                    self._poll()
+                    return
+                logger.error(f"Host hotel change stream failed: {e}")
+            except PyMongoError as e:
+                logger.error(f"Host hotel change stream failed: {e}")
+            except Exception as e:
+                logger.error(f"Host hotel change stream unusable, polling instead: {e}")
+                self._poll()
+                return
+            # Reconnect after a pause; the resync on reconnect covers missed events
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Load all host hotels and start following changes in a background thread"""
+        self.resync()
+        self._thread = threading.Thread(target=self._run, name="host-hotel-mirror", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Host hotel mirror loaded {len(self._docs)} hotels")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    # --------- READS ---------
+    def find(self, country="", city="", stars=()):
+        """Host hotels matching the same case-insensitive filters as the Mongo query"""
+        country, city = location_key(country), location_key(city)
+        with self._lock:
+            if country and city:
+                ids = self._by_city.get((country, city), ())
+            elif country:
+                ids = self._by_country.get(country, ())
+            else:
+                ids = self._by_city_name.get(city, ())
+            docs = [self._docs[doc_id] for doc_id in ids]
+        if stars:
+            wanted = set(stars)
+            docs = [doc for doc in docs if _as_float(doc.get("stars")) in wanted]
+        return docs
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "hotels": len(self._docs),
+            "version": self.version,
+            "changes_applied": self.changes_applied,
+            "seconds_since_sync": round(time.time() - self.last_sync, 1) if self.last_sync else None,
+        }
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,53 @@
+"""
+Typed loading of the scraped hotel dataset
+
+Used by the API and by the training pipeline so both see identical columns:
+"N/A" becomes a real missing value, numeric columns are numeric and the
+repetitive text columns are categorical.
+"""
+import hashlib
+
+import pandas as pd
+
+DEFAULT_DATASET_PATH = "data/enhanced_hotels_dataset.csv"
+
+CATEGORICAL_COLUMNS = ["Country", "City/Place", "Currency"]
+NUMERIC_COLUMNS = ["Stars", "Number of Reviews", "Avg Price per Night (USD)"]
+NA_VALUES = ["N/A", "NA", "n/a", ""]
+
+
+def _dtypes():
+    dtypes = {col: "category" for col in CATEGORICAL_COLUMNS}
+    dtypes.update({col: "string" for col in ["Hotel Name", "Location", "Distance from Center", "Rating"]})
+    return dtypes
+
+
+def coerce_hotel_frame(df):
+    """Apply the dataset's column types to an already-read frame"""
+    for col in NUMERIC_COLUMNS:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def load_hotels_dataset(path=DEFAULT_DATASET_PATH, **read_csv_kwargs):
+    """Read the hotel CSV with explicit dtypes"""
+    df = pd.read_csv(path, dtype=_dtypes(), na_values=NA_VALUES, keep_default_na=False, **read_csv_kwargs)
+    return coerce_hotel_frame(df)
+
+
+def iter_hotel_chunks(path=DEFAULT_DATASET_PATH, chunksize=5000):
+    """Stream the hotel CSV as typed frames of at most chunksize rows"""
+    reader = pd.read_csv(path, dtype=_dtypes(), na_values=NA_VALUES, keep_default_na=False, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield coerce_hotel_frame(chunk)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Content hash used to tie model artifacts to the dataset they were trained on"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
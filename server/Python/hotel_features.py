@@ -0,0 +1,65 @@
+"""
+Feature engineering shared by model training and serving
+
+The hotel price model is a CatBoostRegressor trained on
+['Country', 'City/Place', 'Location', 'Stars', 'Distance from Center']
+with a sqrt(log1p(price)) target. Everything here works on whole frames so a
+batch of hotels is prepared and scored in one pass.
+"""
+import numpy as np
+import pandas as pd
+
+CAT_FEATURES = ['Country', 'City/Place', 'Location']
+NUMERIC_FEATURES = ['Stars', 'Distance from Center']
+FEATURES = CAT_FEATURES + NUMERIC_FEATURES
+TARGET = 'Avg Price per Night (USD)'
+TARGET_TRANSFORM = 'sqrt_log1p'
+
+MISSING_STARS = -1.0
+DEFAULT_DISTANCE = 2.5
+
+_DISTANCE_PATTERN = r'(\d+\.?\d*)'
+
+
+def parse_distance_series(values, default=DEFAULT_DISTANCE):
+    """Parse distances such as "2.5 km from downtown" to floats, filling gaps with default"""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series):
+        parsed = series.astype(float)
+    else:
+        parsed = series.astype("string").str.extract(_DISTANCE_PATTERN, expand=False).astype(float)
+    return parsed.fillna(default)
+
+
+def build_feature_frame(df, default_distance=DEFAULT_DISTANCE, features=FEATURES):
+    """Build the model input frame for a batch of hotels"""
+    frame = pd.DataFrame(index=df.index)
+    for col in CAT_FEATURES:
+        if col in df:
+            frame[col] = df[col].astype("string").fillna("").astype(str)
+        else:
+            frame[col] = ""
+    stars = df['Stars'] if 'Stars' in df else pd.Series(np.nan, index=df.index)
+    frame['Stars'] = pd.to_numeric(stars, errors='coerce').fillna(MISSING_STARS)
+    distance = df['Distance from Center'] if 'Distance from Center' in df else pd.Series(np.nan, index=df.index)
+    frame['Distance from Center'] = parse_distance_series(distance, default_distance)
+    return frame[list(features)]
+
+
+def transform_target(prices):
+    """Price -> model target"""
+    return np.sqrt(np.log1p(np.asarray(prices, dtype=float)))
+
+
+def inverse_target(predictions, transform=TARGET_TRANSFORM):
+    """Model output -> price; invalid or non-positive results become NaN"""
+    predictions = np.asarray(predictions, dtype=float)
+    if transform == 'sqrt_log1p':
+        prices = np.expm1(np.square(predictions))
+    elif transform == 'none':
+        prices = predictions.copy()
+    else:
+        raise ValueError(f"Unknown target transform: {transform}")
+    prices[~np.isfinite(prices) | (prices <= 0)] = np.nan
+    return prices
+
@@ -0,0 +1,309 @@
+"""
+Access to the scraped hotel dataset by destination
+
+EagerHotelStore keeps the whole CSV in memory, which is fine for the current
+dataset. PartitionedHotelStore is for datasets larger than RAM: the CSV is
+streamed once into per-country partitions on disk, a partition is loaded the
+first time its country is requested, and least recently used partitions are
+evicted to keep the loaded data under a memory budget.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import pandas as pd
+
+import hotel_data
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+def destination_key(value):
+    return str(value or "").strip().lower()
+
+
+def filter_destination(df, country="", city="", stars=()):
+    """Rows matching the case-insensitive country/city filters and star ratings"""
+    if country:
+        df = df[df["Country"].str.lower() == destination_key(country)]
+    if city:
+        df = df[df["City/Place"].str.lower() == destination_key(city)]
+    if stars:
+        df = df[df["Stars"].isin(stars)]
+    return df
+
+
+class EagerHotelStore:
+    """The whole dataset in one frame"""
+
+    mode = "eager"
+
+    def __init__(self, path=hotel_data.DEFAULT_DATASET_PATH):
+        self.path = path
+        self.frame = hotel_data.load_hotels_dataset(path)
+
+    @property
+    def loaded(self):
+        return not self.frame.empty
+
+    def __len__(self):
+        return len(self.frame)
+
+    def select(self, country="", city="", stars=()):
+        return filter_destination(self.frame, country, city, stars)
+
+    def destinations(self):
+        """(country, city, hotel count) for every destination in the dataset"""
+        return count_destinations(self.frame)
+
+    def iter_partitions(self):
+        yield self.frame
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "rows": len(self.frame),
+            "memory_mb": round(self.frame.memory_usage(deep=True).sum() / 2**20, 2),
+        }
+
+
+def count_destinations(df):
+    counts = df.groupby(["Country", "City/Place"], observed=True).size()
+    return [(str(country), str(city), int(n)) for (country, city), n in counts.items() if n]
+
+
+def _partition_name(country_key):
+    slug = re.sub(r"[^a-z0-9]+", "-", country_key).strip("-") or "unknown"
+    # Suffix keeps names unique when different countries slug the same way
+    return f"{slug}-{hashlib.blake2b(country_key.encode(), digest_size=4).hexdigest()}"
+
+
+def build_partitions(path, partition_dir, chunksize=50000):
+    """
+    Stream the CSV into one directory of pickled chunks per country and write a
+    manifest with per-country row counts and the city -> countries index.
+    """
+    source_hash = hotel_data.file_sha256(path)
+    staging = f"{partition_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    partitions = {}
+    cities = defaultdict(set)
+    destination_counts = defaultdict(int)
+    columns = []
+    start = time.perf_counter()
+    for chunk_no, chunk in enumerate(hotel_data.iter_hotel_chunks(path, chunksize)):
+        columns = columns or chunk.columns.tolist()
+        country_keys = chunk["Country"].astype("string").fillna("").str.strip().str.lower()
+        for country_key, part in chunk.groupby(country_keys, sort=False, observed=True):
+            entry = partitions.setdefault(country_key, {"dir": _partition_name(country_key), "rows": 0, "parts": 0})
+            part_dir = os.path.join(staging, entry["dir"])
+            os.makedirs(part_dir, exist_ok=True)
+            part.reset_index(drop=True).to_pickle(os.path.join(part_dir, f"part-{chunk_no:05d}.pkl"))
+            entry["rows"] += len(part)
+            entry["parts"] += 1
+            for country, city, n in count_destinations(part):
+                cities[destination_key(city)].add(country_key)
+                destination_counts[(country, city)] += n
+
+    manifest = {
+        "source": os.path.abspath(path),
+        "source_sha256": source_hash,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": sum(entry["rows"] for entry in partitions.values()),
+        "columns": columns,
+        "partitions": partitions,
+        "cities": {city: sorted(keys) for city, keys in cities.items()},
+        "destinations": [[country, city, n] for (country, city), n in destination_counts.items()],
+    }
+    with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    # Another worker may have finished the same build first
+    existing = read_manifest(partition_dir)
+    if existing and existing.get("source_sha256") == source_hash and "destinations" in existing:
+        shutil.rmtree(staging, ignore_errors=True)
+        return existing
+    shutil.rmtree(partition_dir, ignore_errors=True)
+    os.replace(staging, partition_dir)
+    logger.info(
+        f"✅ Partitioned {manifest['rows']} hotels into {len(partitions)} countries "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return manifest
+
+
+def read_manifest(partition_dir):
+    try:
+        with open(os.path.join(partition_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class PartitionedHotelStore:
+    """Per-country partitions loaded on demand under a memory budget"""
+
+    mode = "partitioned"
+
+    def __init__(self, path=hotel_data.DEFAULT_DATASET_PATH, partition_dir="data/partitions",
+                 memory_budget_mb=512, chunksize=50000):
+        """
+        Args:
+            path (str): Source CSV; partitions are rebuilt when its content changes
+            partition_dir (str): Where partitions and the manifest are kept
+            memory_budget_mb (float): Upper bound on loaded partition memory; the most
+                recently used partition is always kept even if it alone exceeds it
+            chunksize (int): Rows read per chunk while partitioning
+        """
+        self.path = path
+        self.partition_dir = partition_dir
+        self.memory_budget = memory_budget_mb * 2**20
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._load_locks = defaultdict(threading.Lock)
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+        manifest = read_manifest(partition_dir)
+        if (manifest is None or manifest.get("source_sha256") != hotel_data.file_sha256(path)
+                or "destinations" not in manifest):
+            manifest = build_partitions(path, partition_dir, chunksize)
+        self.manifest = manifest
+
+    @property
+    def loaded(self):
+        return self.manifest["rows"] > 0
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def countries_for_city(self, city):
+        return self.manifest["cities"].get(destination_key(city), [])
+
+    def destinations(self):
+        return [tuple(entry) for entry in self.manifest["destinations"]]
+
+    def iter_partitions(self):
+        """Every country's hotels in turn, read without displacing the partition cache"""
+        for entry in self.manifest["partitions"].values():
+            yield self._read_partition(entry)
+
+    def map_partitions(self, fn, cache_key=None):
+        """
+        fn(frame) for every partition in turn, so only one partition is in memory.
+        With a cache_key, each result is pickled next to its partition and reused
+        until the partitions are rebuilt or the key changes.
+        """
+        for entry in self.manifest["partitions"].values():
+            path = os.path.join(self.partition_dir, entry["dir"], f"derived-{cache_key}.pkl") if cache_key else None
+            if path and os.path.exists(path):
+                try:
+                    with open(path, "rb") as f:
+                        yield pickle.load(f)
+                    continue
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable partition cache {path}: {e}")
+            result = fn(self._read_partition(entry))
+            if path:
+                staging = f"{path}.tmp-{os.getpid()}"
+                with open(staging, "wb") as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(staging, path)
+            yield result
+
+    def partition(self, country):
+        """All hotels of one country, loading the partition if it is not in memory"""
+        country_key = destination_key(country)
+        entry = self.manifest["partitions"].get(country_key)
+        if entry is None:
+            return self._empty()
+
+        with self._lock:
+            frame = self._cache.get(country_key)
+            if frame is not None:
+                self._cache.move_to_end(country_key)
+                self.hits += 1
+                return frame
+            load_lock = self._load_locks[country_key]
+
+        # One loader per country; concurrent requests for it wait instead of reading twice
+        with load_lock:
+            with self._lock:
+                frame = self._cache.get(country_key)
+                if frame is not None:
+                    self._cache.move_to_end(country_key)
+                    self.hits += 1
+                    return frame
+            frame = self._read_partition(entry)
+            with self._lock:
+                self._cache[country_key] = frame
+                self._sizes[country_key] = int(frame.memory_usage(deep=True).sum())
+                self.loads += 1
+                self._evict()
+        return frame
+
+    def _read_partition(self, entry):
+        part_dir = os.path.join(self.partition_dir, entry["dir"])
+        parts = [pd.read_pickle(os.path.join(part_dir, name)) for name in sorted(os.listdir(part_dir))]
+        frame = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        # Chunks can carry different category sets; unify them once per load
+        for col in hotel_data.CATEGORICAL_COLUMNS:
+            if col in frame:
+                frame[col] = frame[col].astype("category").cat.remove_unused_categories()
+        return frame
+
+    def _empty(self):
+        return hotel_data.coerce_hotel_frame(pd.DataFrame(columns=self.manifest["columns"]))
+
+    def _evict(self):
+        while len(self._cache) > 1 and sum(self._sizes.values()) > self.memory_budget:
+            country_key, _ = self._cache.popitem(last=False)
+            self._sizes.pop(country_key, None)
+            self.evictions += 1
+
+    def select(self, country="", city="", stars=()):
+        if country:
+            countries = [country]
+        else:
+            countries = self.countries_for_city(city)
+        frames = [filter_destination(self.partition(c), country, city, stars) for c in countries]
+        if not frames:
+            return self._empty()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "rows": self.manifest["rows"],
+                "partitions": len(self.manifest["partitions"]),
+                "loaded_partitions": len(self._cache),
+                "memory_mb": round(sum(self._sizes.values()) / 2**20, 2),
+                "memory_budget_mb": round(self.memory_budget / 2**20, 2),
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
+
+
+def open_hotel_store(mode="eager", path=hotel_data.DEFAULT_DATASET_PATH, partition_dir="data/partitions",
+                     memory_budget_mb=512):
+    """Create the store for HOTEL_DATA_MODE ('eager' or 'partitioned')"""
+    if mode == "partitioned":
+        return PartitionedHotelStore(path, partition_dir, memory_budget_mb)
+    if mode != "eager":
+        raise ValueError(f"Unknown hotel data mode: {mode}")
+    return EagerHotelStore(path)
@@ -0,0 +1,148 @@
+"""
+Load scraped hotels into MongoDB
+
+Streams the scraper output in chunks and upserts it into Bagragi.scraped_hotels
+with unordered bulk writes, so re-running after a new scrape updates existing
+hotels instead of duplicating them. Hotels are keyed by normalized (country,
+city, hotel name, location); the indexes the API queries on are created first.
+
+Run from the server directory:
+    python Python/ingest_hotels.py --data data/enhanced_hotels_dataset.csv
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+import hotel_data
+import hotel_features
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLLECTION = "scraped_hotels"
+
+# CSV column -> document field
+FIELDS = {
+    "Country": "country",
+    "City/Place": "city",
+    "Hotel Name": "name",
+    "Stars": "stars",
+    "Rating": "rating",
+    "Number of Reviews": "reviews",
+    "Property Type": "property_type",
+    "Location": "location",
+    "Avg Price per Night (USD)": "price_usd",
+    "Currency": "currency",
+    "Amenities": "amenities",
+    "Scraped Date": "scraped_date",
+}
+KEY_FIELDS = ["country", "city", "name", "location"]
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_key(value):
+    return _whitespace.sub(" ", str(value or "")).strip().casefold()
+
+
+def ensure_indexes(collection):
+    """Unique hotel key for upserts plus the (country, city, stars) lookup used by hotel_info"""
+    collection.create_index([(f"key.{field}", ASCENDING) for field in KEY_FIELDS], unique=True, name="hotel_key")
+    collection.create_index(
+        [("key.country", ASCENDING), ("key.city", ASCENDING), ("stars", ASCENDING)], name="country_city_stars"
+    )
+
+
+def chunk_to_operations(chunk, ingested_at):
+    """One UpdateOne upsert per row of a typed dataset chunk"""
+    chunk = chunk.rename(columns=FIELDS)
+    chunk["distance_km"] = hotel_features.parse_distance_series(chunk["Distance from Center"], default=float("nan"))
+    columns = [c for c in list(FIELDS.values()) + ["distance_km"] if c in chunk]
+    # Missing values become None rather than NaN so Mongo stores null
+    values = chunk[columns].astype(object).where(chunk[columns].notna(), None)
+
+    operations = []
+    for doc in values.to_dict("records"):
+        key = {field: normalize_key(doc.get(field)) for field in KEY_FIELDS}
+        if not key["name"]:
+            continue
+        doc["key"] = key
+        doc["ingested_at"] = ingested_at
+        operations.append(UpdateOne({f"key.{f}": v for f, v in key.items()}, {"$set": doc}, upsert=True))
+    return operations
+
+
+def iter_chunks(path, chunksize):
+    if path.endswith(".json"):
+        # The scraper writes one JSON array, so it cannot be streamed; chunk it after loading
+        with open(path, encoding="utf-8") as f:
+            df = pd.DataFrame(json.load(f)).replace(hotel_data.NA_VALUES, None)
+        df = hotel_data.coerce_hotel_frame(df)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize].copy()
+    else:
+        yield from hotel_data.iter_hotel_chunks(path, chunksize)
+
+
+def ingest(collection, path, chunksize=5000):
+    """Upsert every hotel in path; returns counts and throughput"""
+    ensure_indexes(collection)
+    ingested_at = datetime.now(timezone.utc)
+    totals = {"rows": 0, "upserted": 0, "modified": 0, "matched": 0, "errors": 0}
+    start = time.perf_counter()
+
+    for chunk in iter_chunks(path, chunksize):
+        operations = chunk_to_operations(chunk, ingested_at)
+        totals["rows"] += len(chunk)
+        if not operations:
+            continue
+        try:
+            result = collection.bulk_write(operations, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            # Unordered: the rest of the batch is still applied
+            result = e.details
+            totals["errors"] += len(result.get("writeErrors", []))
+            logger.error(f"❌ {len(result.get('writeErrors', []))} rows failed in batch")
+        totals["upserted"] += result.get("nUpserted", 0)
+        totals["modified"] += result.get("nModified", 0)
+        totals["matched"] += result.get("nMatched", 0)
+
+    elapsed = time.perf_counter() - start
+    totals["seconds"] = round(elapsed, 2)
+    totals["rows_per_second"] = round(totals["rows"] / elapsed, 1) if elapsed else 0.0
+    return totals
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Upsert scraped hotels into MongoDB")
+    parser.add_argument("--data", default=hotel_data.DEFAULT_DATASET_PATH, help="Scraper output (.csv or .json)")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="Bagragi")
+    parser.add_argument("--collection", default=COLLECTION)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk write")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    client = MongoClient(args.mongo_uri)
+    collection = client[args.database][args.collection]
+    totals = ingest(collection, args.data, args.chunk_size)
+    logger.info(
+        f"✅ Ingested {totals['rows']} rows into {args.database}.{args.collection} in {totals['seconds']}s "
+        f"({totals['rows_per_second']} rows/s): {totals['upserted']} new, {totals['modified']} updated, "
+        f"{totals['errors']} failed"
+    )
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+import numpy as np
 import pandas as pd
-import joblib
-import uvicorn
+import asyncio
 import traceback
-from pymongo import MongoClient
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
+import time
+import json
+import hashlib
+import hmac
 import math
 import re
 import logging
 
+import hotel_data
+import hotel_features
+from prediction_cache import MISSING, PredictionCache
+from hotel_store import open_hotel_store
+from destinations import DestinationIndex
+from price_stats import PriceStats, group_sketches, summarize
+from similar_hotels import SimilarHotelIndex
+from currency import BASE_CURRENCY, RateTable, UnknownCurrency, normalize_code
+from cost_of_living import STYLES, CostOfLivingRanking, TripBudgetEstimator, load_cost_of_living
+from singleflight import SingleFlight
+from deadline import Deadline
+from admission import AdmissionController, Rejected
+import profiling
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,9 +41,81 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 PORT = int(os.getenv("PORT", 8000))  # Changed to 8000 to match frontend
+# Split cores between uvicorn workers so CatBoost threads don't oversubscribe the machine
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+PREDICTION_THREADS = int(os.getenv("PREDICTION_THREADS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 50000))
+PREDICTION_CACHE_DISTANCE_STEP = float(os.getenv("PREDICTION_CACHE_DISTANCE_STEP", 0)) or None
+# Serve host hotels from an in-memory mirror kept current from Mongo
+HOST_HOTEL_MIRROR = os.getenv("HOST_HOTEL_MIRROR", "true").lower() in ("1", "true", "yes")
+HOST_HOTEL_POLL_SECONDS = float(os.getenv("HOST_HOTEL_POLL_SECONDS", 5))
+# "partitioned" streams the CSV into per-country partitions loaded on demand
+HOTEL_DATA_MODE = os.getenv("HOTEL_DATA_MODE", "eager").lower()
+HOTEL_PARTITION_DIR = os.getenv("HOTEL_PARTITION_DIR", "data/partitions")
+HOTEL_MEMORY_BUDGET_MB = float(os.getenv("HOTEL_MEMORY_BUDGET_MB", 512))
+# How often to check the CSV for changes (0 disables reloading)
+HOTEL_DATA_RELOAD_SECONDS = float(os.getenv("HOTEL_DATA_RELOAD_SECONDS", 60))
+# Responses smaller than this are not worth compressing
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", 1000))
+# End-to-end budget for hotel_info; stages that overrun it are skipped and reported (0 disables)
+HOTEL_INFO_BUDGET_MS = float(os.getenv("HOTEL_INFO_BUDGET_MS", 2000))
+# Shared secret for /admin routes; they are disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+MAX_PROFILE_SECONDS = 60
+# Admission control for /api routes, per worker: requests beyond MAX_CONCURRENT_REQUESTS wait
+# up to QUEUE_TIMEOUT_MS in a queue of MAX_QUEUED_REQUESTS; the rest get 503 at once (0 disables)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 4 * PREDICTION_THREADS))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", 2 * MAX_CONCURRENT_REQUESTS))
+QUEUE_TIMEOUT_MS = float(os.getenv("QUEUE_TIMEOUT_MS", 1000))
+# Load data after the server starts listening; /health reports 503 until it is ready
+BACKGROUND_STARTUP = os.getenv("BACKGROUND_STARTUP", "true").lower() in ("1", "true", "yes")
+
+@asynccontextmanager
+async def lifespan(app):
+    startup_task = asyncio.create_task(warm_up())
+    if not BACKGROUND_STARTUP:
+        await startup_task
+    yield
+    startup_task.cancel()
+    host_query_executor.shutdown(wait=False, cancel_futures=True)
+    scoring_executor.shutdown(wait=False, cancel_futures=True)
+    if reload_task is not None:
+        reload_task.cancel()
+    if host_hotel_mirror is not None:
+        host_hotel_mirror.stop()
 
 # Create FastAPI app
-app = FastAPI(title="Hotel API with ML Predictions", version="1.0.0")
+app = FastAPI(title="Hotel API with ML Predictions", version="1.0.0", lifespan=lifespan)
+
+startup = {"ready": False, "seconds": None}
+
+@app.middleware("http")
+async def wait_for_startup(request: Request, call_next):
+    """Data routes answer 503 until warm_up() has loaded what they read"""
+    if not startup["ready"] and request.url.path.startswith("/api/"):
+        return JSONResponse(
+            content={"error": "Service is starting up, try again shortly"},
+            status_code=503,
+            headers={"Retry-After": "2"}
+        )
+    return await call_next(request)
+
+admission = AdmissionController(MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, QUEUE_TIMEOUT_MS / 1000)
+
+@app.middleware("http")
+async def admit_request(request: Request, call_next):
+    """Shed /api load past the concurrency limit and queue; /health, /metrics and /admin stay reachable"""
+    if not MAX_CONCURRENT_REQUESTS or not request.url.path.startswith("/api/"):
+        return await call_next(request)
+    try:
+        async with admission.admit():
+            return await call_next(request)
+    except Rejected as e:
+        return JSONResponse(
+            content={"error": "Server is overloaded, try again shortly", "reason": e.reason},
+            status_code=503,
+            headers={"Retry-After": str(admission.retry_after())}
+        )
 
 # Enable CORS for frontend access
 app.add_middleware(
@@ -30,52 +123,155 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
-# Connect to MongoDB
+# Compress large responses for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+# Everything below is filled in by warm_up() once the server is listening
 hotel_collection = None
 mongodb_connected = False
-try:
-    client = MongoClient(MONGO_URI)
-    db = client["Bagragi"]
-    hotel_collection = db["hotels"]
-    # Test the connection
-    client.admin.command('ping')
-    mongodb_connected = True
-    logger.info("✅ MongoDB connected successfully")
-except Exception as e:
-    logger.error(f"❌ MongoDB connection failed: {e}")
-    hotel_collection = None
-    mongodb_connected = False
-
-# Load ML model
+host_hotel_mirror = None
+reload_task = None
+
+MODEL_DIR = "ML/modelforHotels"
 model = None
-model_features = []
-try:
-    model = joblib.load("ML/modelforHotels/hotel_price_model.pkl")
-    logger.info("✅ ML model loaded successfully")
-    
-    # Try to get model feature names if available
-    if hasattr(model, 'feature_names_in_'):
-        model_features = model.feature_names_in_.tolist()
+model_features = list(hotel_features.FEATURES)
+model_metadata = {}
+model_format = None
+target_transform = hotel_features.TARGET_TRANSFORM
+default_distance = hotel_features.DEFAULT_DISTANCE
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DISTANCE_STEP)
+
+# Run hotel_info stages that have a deadline; work that overruns it finishes in the background.
+# Mongo queries and model scoring get separate pools so slow scoring can't hold up host hotel queries.
+host_query_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="host-hotel-query")
+scoring_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-scoring")
+# Scoring jobs still running after their request gave up on them
+overrunning_scoring = set()
+
+# Backup CSV dataset and the indexes derived from it, built by load_hotel_data()
+hotel_store = None
+hotel_data_mtime = None
+
+# Exchange rates for converting prices to the requested currency
+rate_table = RateTable(os.getenv("EXCHANGE_RATES_PATH", "data/exchange_rates.json"))
+
+# Cost-of-living table for trip budgets and ranked queries
+trip_budget_estimator = None
+cost_of_living_ranking = None
+
+# Destination names for autocomplete and near-match resolution
+destination_index = DestinationIndex([])
+similar_hotels = SimilarHotelIndex()
+
+# --------- STARTUP ---------
+def connect_mongo():
+    global hotel_collection, mongodb_connected
+    from pymongo import MongoClient
+    try:
+        client = MongoClient(MONGO_URI)
+        db = client["Bagragi"]
+        hotel_collection = db["hotels"]
+        # Test the connection
+        client.admin.command('ping')
+        mongodb_connected = True
+        logger.info("✅ MongoDB connected successfully")
+    except Exception as e:
+        logger.error(f"❌ MongoDB connection failed: {e}")
+        hotel_collection = None
+        mongodb_connected = False
+
+def load_model(model_dir=MODEL_DIR):
+    """Load the native CatBoost model if present, else the joblib pickle; returns (model, format)"""
+    native_path = f"{model_dir}/hotel_price_model.cbm"
+    if os.path.exists(native_path):
+        from catboost import CatBoostRegressor
+        return CatBoostRegressor().load_model(native_path, format="cbm"), "cbm"
+    import joblib
+    return joblib.load(f"{model_dir}/hotel_price_model.pkl"), "pickle"
+
+def load_model_files():
+    global model, model_format, model_metadata, model_features, target_transform, default_distance
+    try:
+        model, model_format = load_model()
+        logger.info(f"✅ ML model loaded successfully ({model_format}, {PREDICTION_THREADS} prediction threads)")
+    except Exception as e:
+        logger.error(f"❌ Failed to load model: {e}")
+        model = None
+
+    # Metadata written by train_hotel_model.py describes how the model was trained
+    try:
+        with open(f"{MODEL_DIR}/hotel_price_model.json", encoding="utf-8") as f:
+            model_metadata = json.load(f)
+        logger.info(f"Model version {model_metadata.get('version')}, MAE {model_metadata.get('metrics', {}).get('mae')}")
+    except FileNotFoundError:
+        logger.warning("No model metadata found, assuming the notebook's training setup")
+    except Exception as e:
+        logger.error(f"❌ Failed to read model metadata: {e}")
+
+    model_features = list(
+        model_metadata.get("features")
+        or getattr(model, 'feature_names_', None)
+        or hotel_features.FEATURES
+    )
+    target_transform = model_metadata.get("target_transform", hotel_features.TARGET_TRANSFORM)
+    default_distance = model_metadata.get("default_distance", hotel_features.DEFAULT_DISTANCE)
+    if model is not None:
         logger.info(f"Model features: {model_features}")
-    else:
-        # Default feature names based on your current implementation
-        model_features = ['stars', 'distance']
-        logger.info("Using default features: stars, distance")
-        
-except Exception as e:
-    logger.error(f"❌ Failed to load model: {e}")
-    model = None
-
-# Load backup CSV dataset
-sample_data = pd.DataFrame()
-try:
-    sample_data = pd.read_csv("data/enhanced_hotels_dataset.csv")
-    logger.info(f"✅ Sample CSV data loaded: {len(sample_data)} hotels")
-    logger.info(f"CSV columns: {sample_data.columns.tolist()}")
-except Exception as e:
-    logger.error(f"❌ Failed to load sample CSV: {e}")
+
+def load_reference_data():
+    """Exchange rates and the cost-of-living table"""
+    global trip_budget_estimator, cost_of_living_ranking
+    try:
+        rate_table.load()
+    except Exception as e:
+        logger.error(f"❌ Failed to load exchange rates, only {BASE_CURRENCY} is available: {e}")
+
+    try:
+        cost_of_living = load_cost_of_living(rate_table, os.getenv("COST_OF_LIVING_PATH", "cost_of_living_dataset.csv"))
+        trip_budget_estimator = TripBudgetEstimator(cost_of_living)
+        cost_of_living_ranking = CostOfLivingRanking(cost_of_living)
+        logger.info(f"✅ Cost of living data loaded: {len(cost_of_living_ranking)} countries, "
+                    f"{len(trip_budget_estimator)} with trip budgets")
+    except Exception as e:
+        logger.error(f"❌ Failed to load cost of living data: {e}")
+
+def load_model_and_hotels():
+    load_model_files()
+    try:
+        load_hotel_data()
+    except Exception as e:
+        logger.error(f"❌ Failed to load sample CSV: {e}")
+
+async def start_host_hotel_mirror():
+    global host_hotel_mirror
+    from host_hotels import HostHotelMirror
+    try:
+        mirror = HostHotelMirror(hotel_collection, poll_interval=HOST_HOTEL_POLL_SECONDS)
+        mirror.listeners.append(on_host_hotel_changes)
+        await asyncio.to_thread(mirror.start)
+        host_hotel_mirror = mirror
+    except Exception as e:
+        logger.error(f"❌ Host hotel mirror failed to start, querying Mongo directly: {e}")
+
+async def warm_up():
+    """Connect to Mongo and load the model and data side by side, then start background work"""
+    global reload_task
+    started = time.perf_counter()
+    await asyncio.gather(
+        asyncio.to_thread(connect_mongo),
+        asyncio.to_thread(load_model_and_hotels),
+        asyncio.to_thread(load_reference_data),
+    )
+    if HOST_HOTEL_MIRROR and mongodb_connected:
+        await start_host_hotel_mirror()
+    if HOTEL_DATA_RELOAD_SECONDS > 0:
+        reload_task = asyncio.create_task(watch_hotel_data())
+    startup.update(ready=True, seconds=round(time.perf_counter() - started, 2))
+    logger.info(f"✅ Ready to serve after {startup['seconds']}s")
 
 # --------- UTILITY FUNCTIONS ---------
 def sanitize_for_json(data):
@@ -93,68 +289,83 @@ def sanitize_for_json(data):
     else:
         return data
 
-def parse_distance(distance_str):
-    """Parse distance string to float"""
-    if pd.isna(distance_str) or distance_str == "":
-        return 2.5  # default
-    
-    try:
-        # Handle different formats: "2.5 km", "2.5", "2.5 km from downtown"
-        distance_str = str(distance_str).lower()
-        
-        # Extract number using regex
-        match = re.search(r'(\d+\.?\d*)', distance_str)
-        if match:
-            return float(match.group(1))
-        else:
-            return 2.5
-    except:
-        return 2.5
-
-def predict_hotel_price(stars, distance, additional_features=None):
-    """Predict hotel price using ML model"""
-    if not model:
-        return None
+def model_predict(features):
+    """Raw model output with an explicit thread count for CatBoost models"""
+    if type(model).__module__.startswith("catboost"):
+        return model.predict(features, thread_count=PREDICTION_THREADS)
+    return model.predict(features)
+
+def score_features(keys, features):
+    """Model prices for distinct feature vectors, added to the prediction cache"""
+    scored = np.round(hotel_features.inverse_target(model_predict(features), target_transform), 2)
+    scored = [None if math.isnan(p) else float(p) for p in scored]
+    prediction_cache.put_many(keys, scored)
+    return scored
+
+def predict_hotel_prices(hotels_df, deadline=None):
+    """
+    Predict prices for a batch of hotels; returns a list with None for failures.
+    Feature vectors already in the prediction cache are not rescored, and the
+    remaining unique vectors go to the model in a single call. With a deadline,
+    a model call that overruns it leaves those prices as None and marks
+    "model_scoring" degraded; the call still completes and fills the cache,
+    and until it does, other requests skip scoring rather than queue behind it.
+    """
+    if model is None or hotels_df.empty:
+        return [None] * len(hotels_df)
     
     try:
-        # Ensure we have valid numeric values
-        stars = float(stars) if stars and not pd.isna(stars) else 3.0
-        distance = float(distance) if distance and not pd.isna(distance) else 2.5
-        
-        # Prepare features based on model requirements
-        if len(model_features) == 2:
-            # Simple model with stars and distance
-            features = [[stars, distance]]
-        else:
-            # More complex model - would need additional feature engineering
-            features = [[stars, distance]]
-            logger.warning("Model expects more features than provided, using basic features")
-        
-        prediction = model.predict(features)[0]
+        prediction_cache.bind_model((id(model), model_metadata.get("version")))
+        features = hotel_features.build_feature_frame(
+            hotels_df, default_distance=default_distance, features=model_features
+        )
+        features = prediction_cache.quantize(features)
+        keys = list(features.itertuples(index=False, name=None))
+        prices = prediction_cache.get_many(keys)
         
-        # Validate prediction
-        if math.isfinite(prediction) and prediction > 0:
-            return round(prediction, 2)
-        else:
-            return None
-            
+        # Score each distinct missing feature vector once
+        miss_positions = {}
+        for i, (key, price) in enumerate(zip(keys, prices)):
+            if price is MISSING and key not in miss_positions:
+                miss_positions[key] = i
+        if miss_positions:
+            miss_keys = list(miss_positions)
+            miss_features = features.iloc[list(miss_positions.values())]
+            if deadline is None:
+                scored = score_features(miss_keys, miss_features)
+            elif overrunning_scoring:
+                # New jobs would only queue behind the overrunning ones and time out as well
+                deadline.mark("model_scoring")
+                scored = [None] * len(miss_keys)
+            else:
+                job = scoring_executor.submit(score_features, miss_keys, miss_features)
+                try:
+                    scored = job.result(timeout=deadline.remaining())
+                except TimeoutError:
+                    logger.warning(f"Model scoring of {len(miss_keys)} hotels overran the latency budget")
+                    deadline.mark("model_scoring")
+                    scored = [None] * len(miss_keys)
+                    if not job.cancel():
+                        # Let it finish and fill the cache, holding back new jobs until it does
+                        overrunning_scoring.add(job)
+                        job.add_done_callback(overrunning_scoring.discard)
+            lookup = dict(zip(miss_keys, scored))
+            prices = [lookup[key] if price is MISSING else price for key, price in zip(keys, prices)]
+        return prices
     except Exception as e:
         logger.error(f"Prediction error: {e}")
-        return None
+        return [None] * len(hotels_df)
 
-def process_csv_hotels(filtered_csv):
+def process_csv_hotels(filtered_csv, deadline=None):
     """Process CSV hotels and add ML predictions"""
     results = []
+    predicted_prices = predict_hotel_prices(filtered_csv, deadline)
     
-    for _, row in filtered_csv.iterrows():
+    for row, predicted_price in zip(filtered_csv.to_dict("records"), predicted_prices):
         try:
             # Extract and clean data
             stars = row.get("Stars", 3)
             distance_raw = row.get("Distance from Center", "2.5 km")
-            distance = parse_distance(distance_raw)
-            
-            # Get ML prediction
-            predicted_price = predict_hotel_price(stars, distance)
             
             # Create hotel record
             hotel_record = {
@@ -184,17 +395,25 @@ def process_csv_hotels(filtered_csv):
     
     return results
 
-def process_mongo_hotels(mongo_hotels):
+def mongo_feature_frame(mongo_hotels):
+    """Model input columns for MongoDB host hotels"""
+    return pd.DataFrame({
+        "Country": [h.get("location", {}).get("country", "") for h in mongo_hotels],
+        "City/Place": [h.get("location", {}).get("city", "") for h in mongo_hotels],
+        "Location": [h.get("location", {}).get("address", "") for h in mongo_hotels],
+        "Stars": [h.get("stars", 3) for h in mongo_hotels],
+        "Distance from Center": hotel_features.DEFAULT_DISTANCE,  # host hotels have no distance yet
+    })
+
+def process_mongo_hotels(mongo_hotels, deadline=None):
     """Process MongoDB hotels and add ML predictions"""
     results = []
+    predicted_prices = predict_hotel_prices(mongo_feature_frame(mongo_hotels), deadline)
     
-    for h in mongo_hotels:
+    for h, predicted_price in zip(mongo_hotels, predicted_prices):
         try:
             stars = float(h.get("stars", 3))
-            distance = 2.5  # default for mongo hotels
-            
-            # Get ML prediction
-            predicted_price = predict_hotel_price(stars, distance)
+            distance = hotel_features.DEFAULT_DISTANCE
             
             hotel_record = {
                 "Country": h.get("location", {}).get("country", ""),
@@ -222,14 +441,298 @@ def process_mongo_hotels(mongo_hotels):
     
     return results
 
+def parse_star_filter(star_filter):
+    """Normalize the 'stars' request value to a sorted tuple of floats (empty if not given)"""
+    if not star_filter:
+        return ()
+    values = star_filter if isinstance(star_filter, list) else [star_filter]
+    return tuple(sorted({float(s) for s in values}))
+
+# --------- DATASET INDEXES ---------
+price_stats = PriceStats()
+
+def price_stats_cache_key():
+    """Names cached per-partition price sketches; None (no caching) when the model has no version"""
+    if model is None:
+        return "price-stats-unscored"
+    version = model_metadata.get("version")
+    if version is None:
+        return None
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", f"price-stats-{version}-{model_format}")
+
+def load_hotel_data():
+    """Open the dataset, score it once and rebuild everything derived from it"""
+    global hotel_store, hotel_data_mtime, destination_index, similar_hotels
+    mtime = os.path.getmtime(hotel_data.DEFAULT_DATASET_PATH)
+    store = open_hotel_store(
+        HOTEL_DATA_MODE, hotel_data.DEFAULT_DATASET_PATH, HOTEL_PARTITION_DIR, HOTEL_MEMORY_BUDGET_MB
+    )
+    if store.mode == "eager":
+        # The whole dataset is in memory anyway, and the similar-hotel index needs all of it
+        columns = ["Country", "City/Place", "Hotel Name", "Stars", "Rating", "Location",
+                   "Distance from Center", hotel_features.TARGET]
+        scored = store.frame[columns].assign(**{"Predicted Price": predict_hotel_prices(store.frame)})
+        partials = [group_sketches(scored)]
+        similar = SimilarHotelIndex(scored)
+    else:
+        # One partition at a time, with its price sketches cached on disk for this model. The
+        # similar-hotel index would hold every hotel, so it is skipped to stay within HOTEL_MEMORY_BUDGET_MB
+        partials = store.map_partitions(
+            lambda frame: group_sketches(frame.assign(**{"Predicted Price": predict_hotel_prices(frame)})),
+            price_stats_cache_key(),
+        )
+        similar = SimilarHotelIndex(None)
+    price_stats.build(partials)
+    hotel_store, hotel_data_mtime = store, mtime
+    destination_index, similar_hotels = DestinationIndex(store.destinations()), similar
+    logger.info(
+        f"✅ Sample CSV data loaded ({store.mode}): {len(store)} hotels, "
+        f"{len(destination_index)} destinations, {price_stats.stats()['groups']} price groups"
+    )
+
+async def watch_hotel_data():
+    """Reload the dataset and its indexes when the CSV changes on disk"""
+    while True:
+        await asyncio.sleep(HOTEL_DATA_RELOAD_SECONDS)
+        try:
+            if os.path.getmtime(hotel_data.DEFAULT_DATASET_PATH) != hotel_data_mtime:
+                logger.info("Hotel dataset changed, reloading")
+                await asyncio.to_thread(load_hotel_data)
+        except Exception as e:
+            logger.error(f"❌ Hotel dataset reload failed, keeping the loaded data: {e}")
+
+def on_host_hotel_changes(changes):
+    """Keep host hotels in the price stats as the mirror applies writes, scoring each batch in one call"""
+    written = [new for _, new in changes if new is not None]
+    for old, new in changes:
+        if new is None:
+            price_stats.remove_host(old["_id"])
+    if not written:
+        return
+    for doc, predicted in zip(written, predict_hotel_prices(mongo_feature_frame(written))):
+        location = doc.get("location") or {}
+        price_stats.set_host(doc["_id"], location.get("country"), location.get("city"), doc.get("stars"), predicted)
+
+def summarize_hotels(hotels):
+    """Price stats for an explicit list of response hotels"""
+    return {
+        "hotels": len(hotels),
+        "observed": summarize([
+            h["Avg Price per Night (USD)"] for h in hotels
+            if not h.get("Host Hotel") and isinstance(h.get("Avg Price per Night (USD)"), (int, float))
+        ]),
+        "predicted": summarize([h["Predicted Price"] for h in hotels if h.get("Predicted Price") is not None]),
+    }
+
+def convert_hotel_prices(hotels, currency):
+    """
+    Add each hotel's listed price as "Price" and convert "Predicted Price" (USD),
+    both in the requested currency, so mixed-currency results compare directly.
+    """
+    listed = rate_table.convert(
+        [h.get("Price Per Night") if h.get("Host Hotel") else h.get("Avg Price per Night (USD)") for h in hotels],
+        [h.get("Currency") or BASE_CURRENCY for h in hotels],
+        currency,
+    )
+    predicted = rate_table.convert([h.get("Predicted Price") for h in hotels], BASE_CURRENCY, currency)
+    for h, price, predicted_price in zip(hotels, np.round(listed, 2), np.round(predicted, 2)):
+        h["Price"] = None if np.isnan(price) else float(price)
+        h["Predicted Price"] = None if np.isnan(predicted_price) else float(predicted_price)
+        h["Price Currency"] = currency
+    return hotels
+
+def spellings(*names):
+    """Distinct non-empty names, compared case-insensitively, in the order given"""
+    unique = {}
+    for name in names:
+        if name:
+            unique.setdefault(name.lower(), name)
+    return tuple(unique.values())
+
+def query_host_hotels(countries, cities, stars, deadline):
+    """Host hotels from Mongo matching any of the spellings, with a client-side timeout of whatever budget is left"""
+    import pymongo
+    mongo_query = {}
+    
+    if countries:
+        pattern = "|".join(re.escape(country) for country in countries)
+        mongo_query["location.country"] = {"$regex": f"^(?:{pattern})$", "$options": "i"}
+    if cities:
+        pattern = "|".join(re.escape(city) for city in cities)
+        mongo_query["location.city"] = {"$regex": f"^(?:{pattern})$", "$options": "i"}
+    if stars:
+        mongo_query["stars"] = {"$in": list(stars)}
+
+    remaining = deadline.remaining()
+    if remaining == 0:
+        # pymongo.timeout(0) means no timeout at all
+        raise TimeoutError("latency budget used up before the host hotel query started")
+    with pymongo.timeout(remaining):
+        return list(hotel_collection.find(mongo_query))
+
+def fill_missing_predictions(hotels):
+    """Stand in the destination's median predicted price for hotels the model didn't score in time"""
+    for h in hotels:
+        if h.get("Predicted Price") is not None:
+            continue
+        stats = price_stats.lookup(h.get("Country"), h.get("City/Place"), parse_star_filter(h.get("Stars")))
+        if stats and stats["predicted"]["count"]:
+            h["Predicted Price"] = stats["predicted"]["median"]
+            h["Predicted Price Source"] = "destination_median"
+
+def find_mirrored_host_hotels(countries, cities, stars):
+    """Host hotels from the in-memory mirror matching any of the spellings"""
+    found = {}
+    for country in countries or ("",):
+        for city in cities or ("",):
+            for doc in host_hotel_mirror.find(country, city, stars):
+                found.setdefault(doc["_id"], doc)
+    return list(found.values())
+
+def compute_hotel_info(country, city, stars, currency=BASE_CURRENCY, requested=None):
+    """
+    Build the hotel_info response body; runs in a worker thread. Stages that
+    overrun HOTEL_INFO_BUDGET_MS are cut short and listed under "degraded".
+    country and city are the names resolved against the CSV data; host hotels
+    are matched by those and by the requested spelling, since hosts enter
+    their own location names.
+    """
+    deadline = Deadline(HOTEL_INFO_BUDGET_MS / 1000 if HOTEL_INFO_BUDGET_MS > 0 else None)
+    requested = requested or {}
+    host_countries = spellings(requested.get("country"), country)
+    host_cities = spellings(requested.get("city"), city)
+
+    # Start the Mongo query first so it overlaps CSV scoring
+    host_query = None
+    if host_hotel_mirror is None and mongodb_connected and hotel_collection is not None:
+        host_query = host_query_executor.submit(query_host_hotels, host_countries, host_cities, stars, deadline)
+
+    # --- FILTER CSV DATA ---
+    csv_results = []
+    if hotel_store is not None and hotel_store.loaded:
+        filtered_csv = hotel_store.select(country, city, stars)
+        csv_results = process_csv_hotels(filtered_csv, deadline)
+        logger.info(f"Found {len(csv_results)} CSV hotels")
+
+    # --- QUERY MONGO ---
+    mongo_results = []
+    if host_hotel_mirror is not None:
+        mongo_results = process_mongo_hotels(find_mirrored_host_hotels(host_countries, host_cities, stars), deadline)
+        logger.info(f"Found {len(mongo_results)} host hotels in memory")
+    elif host_query is not None:
+        try:
+            mongo_hotels = host_query.result(timeout=deadline.remaining())
+            mongo_results = process_mongo_hotels(mongo_hotels, deadline)
+            logger.info(f"Found {len(mongo_results)} MongoDB hotels")
+        except Exception as e:
+            logger.error(f"MongoDB query error: {type(e).__name__} {e}")
+            deadline.mark("host_hotels")
+            mongo_results = []
+
+    # --- COMBINE AND CALCULATE STATS ---
+    all_hotels = csv_results + mongo_results
+    if "model_scoring" in deadline.degraded:
+        fill_missing_predictions(all_hotels)
+
+    if host_hotel_mirror is not None or not mongo_results:
+        stats = price_stats.lookup(country, city, stars)
+    else:
+        # Host hotels read straight from Mongo are not tracked in the stats table
+        stats = summarize_hotels(all_hotels)
+
+    # Prefer the ML estimate; fall back to observed USD prices when there are no predictions
+    prices = None
+    if stats:
+        prices = stats["predicted"] if stats["predicted"]["count"] else stats["observed"]
+    factor = rate_table.factor(BASE_CURRENCY, currency)
+    avg_price = round(prices["mean"] * factor, 2) if prices and prices["count"] else None
+    price_band = {
+        k: round(prices[k] * factor, 2) for k in ("p10", "median", "p90")
+    } if prices and prices["count"] else None
+    convert_hotel_prices(all_hotels, currency)
+    # Hotels in this response the model scored, not those filled from the destination median
+    ml_predictions = sum(
+        1 for h in all_hotels
+        if h.get("Predicted Price") is not None and h.get("Predicted Price Source") != "destination_median"
+    )
+
+    logger.info(f"Returning {len(all_hotels)} hotels, avg_price={avg_price}")
+    return {
+        "hotels": all_hotels,
+        "average_price": avg_price,
+        "price_band": price_band,
+        "currency": currency,
+        "count": len(all_hotels),
+        "ml_predictions": ml_predictions,
+        "model_status": "active" if model else "unavailable",
+        "degraded": deadline.degraded
+    }
+
+# Concurrent requests for the same destination share one computation
+hotel_info_flight = SingleFlight("hotel_info")
+
+# --------- CONDITIONAL REQUESTS ---------
+hotel_info_not_modified = 0
+hotel_info_degraded = Counter()
+
+def hotel_info_etag(query):
+    """
+    Validator for a hotel_info response, built from the versions of the data it
+    is computed from and the normalized query. None when host hotels are read
+    straight from Mongo, since their changes can't be seen without the query.
+    """
+    if host_hotel_mirror is None and mongodb_connected:
+        return None
+    versions = (
+        hotel_data_mtime, model_metadata.get("version"), model_format,
+        host_hotel_mirror.version if host_hotel_mirror is not None else None, rate_table.version,
+    )
+    return '"' + hashlib.blake2b(repr((versions, query)).encode(), digest_size=12).hexdigest() + '"'
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match header lists etag"""
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
 # --------- MAIN API ROUTE ---------
 @app.post("/api/hotel_info")
 async def hotel_info(request: Request):
     try:
         data = await request.json()
-        country = data.get("country", "").strip()
-        city = data.get("city", "").strip()
+    except ValueError:
+        return JSONResponse(content={"error": "Request body must be JSON"}, status_code=400)
+    if not isinstance(data, dict):
+        return JSONResponse(content={"error": "Request body must be a JSON object"}, status_code=400)
+    return await hotel_info_response(request, data)
+
+@app.get("/api/hotel_info")
+async def hotel_info_get(request: Request):
+    """Same as the POST form, e.g. ?country=India&city=Delhi&stars=4&stars=5, so HTTP caches can revalidate"""
+    params = request.query_params
+    stars = params.getlist("stars")
+    data = {
+        "country": params.get("country", ""),
+        "city": params.get("city", ""),
+        "stars": stars if len(stars) > 1 else (stars[0] if stars else None),
+        "currency": params.get("currency"),
+    }
+    return await hotel_info_response(request, data)
+
+async def hotel_info_response(request, data):
+    try:
+        country = data.get("country") or ""
+        city = data.get("city") or ""
         star_filter = data.get("stars")
+        currency = data.get("currency") or BASE_CURRENCY
+        if not all(isinstance(value, str) for value in (country, city, currency)):
+            return JSONResponse(
+                content={"error": "'country', 'city' and 'currency' must be strings"},
+                status_code=400
+            )
+        country, city, currency = country.strip(), city.strip(), normalize_code(currency)
         
         logger.info(f"Request: country={country}, city={city}, stars={star_filter}")
 
@@ -239,87 +742,60 @@ async def hotel_info(request: Request):
                 status_code=400
             )
 
-        # --- FILTER CSV DATA ---
-        csv_results = []
-        if not sample_data.empty:
-            filtered_csv = sample_data.copy()
-            
-            if country:
-                filtered_csv = filtered_csv[
-                    filtered_csv["Country"].str.lower() == country.lower()
-                ]
-            
-            if city:
-                filtered_csv = filtered_csv[
-                    filtered_csv["City/Place"].str.lower() == city.lower()
-                ]
-                
-            if star_filter:
-                try:
-                    stars = [float(s) for s in (star_filter if isinstance(star_filter, list) else [star_filter])]
-                    filtered_csv = filtered_csv[filtered_csv["Stars"].isin(stars)]
-                except ValueError:
-                    return JSONResponse(
-                        content={"error": "Invalid 'stars' value. Must be a number between 1-5"}, 
-                        status_code=400
-                    )
-            
-            csv_results = process_csv_hotels(filtered_csv)
-            logger.info(f"Found {len(csv_results)} CSV hotels")
-
-        # --- QUERY MONGO ---
-        mongo_results = []
-        if mongodb_connected and hotel_collection is not None:
-            try:
-                mongo_query = {}
-                
-                if country:
-                    mongo_query["location.country"] = {"$regex": f"^{country}$", "$options": "i"}
-                if city:
-                    mongo_query["location.city"] = {"$regex": f"^{city}$", "$options": "i"}
-                if star_filter:
-                    try:
-                        stars = [float(s) for s in (star_filter if isinstance(star_filter, list) else [star_filter])]
-                        mongo_query["stars"] = {"$in": stars}
-                    except:
-                        pass
-
-                mongo_hotels = list(hotel_collection.find(mongo_query))
-                mongo_results = process_mongo_hotels(mongo_hotels)
-                logger.info(f"Found {len(mongo_results)} MongoDB hotels")
-            except Exception as e:
-                logger.error(f"MongoDB query error: {e}")
-                mongo_results = []
-
-        # --- COMBINE AND CALCULATE STATS ---
-        all_hotels = csv_results + mongo_results
-        
-        # Calculate average price from ML predictions
-        predicted_prices = [
-            h["Predicted Price"] for h in all_hotels 
-            if h.get("Predicted Price") is not None and isinstance(h["Predicted Price"], (int, float))
-        ]
-        
-        avg_price = round(sum(predicted_prices) / len(predicted_prices), 2) if predicted_prices else None
-        
-        # Add USD prices as backup average if no ML predictions
-        if avg_price is None:
-            usd_prices = [
-                h.get("Avg Price per Night (USD)", 0) * 83 for h in all_hotels 
-                if h.get("Avg Price per Night (USD)") and h.get("Avg Price per Night (USD)") > 0
-            ]
-            avg_price = round(sum(usd_prices) / len(usd_prices), 2) if usd_prices else None
+        try:
+            stars = parse_star_filter(star_filter)
+        except (TypeError, ValueError):
+            return JSONResponse(
+                content={"error": "Invalid 'stars' value. Must be a number between 1-5"}, 
+                status_code=400
+            )
 
-        response = {
-            "hotels": all_hotels,
-            "average_price": avg_price,
-            "count": len(all_hotels),
-            "ml_predictions": len(predicted_prices),
-            "model_status": "active" if model else "unavailable"
-        }
+        rate_table.reload_if_changed()
+        try:
+            rate_table.rate(currency)
+        except UnknownCurrency:
+            return JSONResponse(
+                content={"error": f"Unsupported currency '{currency}'", "supported": rate_table.currencies()},
+                status_code=400
+            )
 
-        logger.info(f"Returning {len(all_hotels)} hotels, avg_price={avg_price}")
-        return JSONResponse(content=response)
+        # Repeat requests for unchanged data are answered without recomputing
+        etag = hotel_info_etag((country, city, stars, currency))
+        headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else {}
+        if etag_matches(request, etag):
+            global hotel_info_not_modified
+            hotel_info_not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        # Resolve spelling variants ("Kiev", "USA", "Sao Paulo") to the names in the data. A misspelled
+        # name is kept as given, since its nearest match may be another place, and gets suggestions
+        requested = {"country": country, "city": city}
+        suggestions = []
+        resolved_country = destination_index.resolve(country, "country")
+        if country and resolved_country is None:
+            suggestions += [{"country": e.name} for e in destination_index.suggest(country, "country")]
+        country = resolved_country or country
+        resolved_city = destination_index.resolve(city, "city", country=country)
+        if city and resolved_city is None:
+            suggestions += [
+                {"country": e.country, "city": e.name}
+                for e in destination_index.suggest(city, "city", country=country)
+            ]
+        city = resolved_city or city
+
+        key = (country.lower(), city.lower(), requested["country"].lower(), requested["city"].lower(), stars, currency)
+        response = await hotel_info_flight.run(key, compute_hotel_info, country, city, stars, currency, requested)
+        if response["degraded"]:
+            # A partial answer must not be served again as a 304
+            headers = {}
+            for stage in response["degraded"]:
+                hotel_info_degraded[stage] += 1
+        resolved = {"country": country, "city": city}
+        if resolved != requested:
+            response = {**response, "resolved_destination": resolved}
+        if suggestions:
+            response = {**response, "suggestions": suggestions}
+        return JSONResponse(content=response, headers=headers)
 
     except Exception as e:
         logger.error(f"API Error: {str(e)}")
@@ -329,17 +805,241 @@ async def hotel_info(request: Request):
             status_code=500
         )
 
+# --------- SIMILAR HOTELS ---------
+@app.post("/api/similar_hotels")
+async def similar_hotels_route(request: Request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return JSONResponse(content={"error": "Request body must be JSON"}, status_code=400)
+    if not isinstance(data, dict):
+        return JSONResponse(content={"error": "Request body must be a JSON object"}, status_code=400)
+    if hotel_store is not None and hotel_store.mode == "partitioned":
+        return JSONResponse(
+            content={"error": "Similar hotels are not available with HOTEL_DATA_MODE=partitioned"},
+            status_code=503
+        )
+    hotel_name = str(data.get("hotel_name", "")).strip()
+    city = str(data.get("city", "")).strip()
+    currency = normalize_code(data.get("currency") or BASE_CURRENCY)
+    try:
+        k = max(1, min(int(data.get("k", 10)), 50))
+        rate_table.rate(currency)
+    except (TypeError, ValueError):
+        return JSONResponse(content={"error": "Invalid 'k' or 'currency' value"}, status_code=400)
+
+    index = similar_hotels
+    hotel_id = index.find(hotel_name, city)
+    if hotel_id is None:
+        return JSONResponse(content={"error": f"Hotel '{hotel_name}' not found in '{city}'"}, status_code=404)
+
+    matches = index.similar(
+        hotel_id, k, cheaper=bool(data.get("cheaper")), same_city=bool(data.get("same_city"))
+    )
+    ids = [hotel_id] + [i for i, _ in matches]
+    records = sanitize_for_json(index.hotels.iloc[ids].to_dict("records"))
+    convert_hotel_prices(records, currency)
+    for record, (_, distance) in zip(records[1:], matches):
+        record["Similarity Distance"] = round(distance, 3)
+    return {"hotel": records[0], "similar": records[1:], "count": len(matches), "currency": currency}
+
+# --------- TRIP BUDGET ---------
+MAX_TRIPS_PER_REQUEST = 1000
+
+def hotel_price_band(country, city):
+    """Nightly p10/median/p90 (USD) for a destination, falling back to the whole country"""
+    stats = price_stats.lookup(country, city) if city else None
+    stats = stats or price_stats.lookup(country)
+    if not stats:
+        return {"p10": None, "median": None, "p90": None}
+    prices = stats["predicted"] if stats["predicted"]["count"] else stats["observed"]
+    return {k: prices[k] for k in ("p10", "median", "p90")}
+
+def parse_trips(trips):
+    """Request trips as a frame with resolved names; raises ValueError on bad input"""
+    frame = pd.DataFrame({
+        "country": [str(t.get("country", "")).strip() for t in trips],
+        "city": [str(t.get("city", "") or "").strip() for t in trips],
+        "days": [int(t.get("days", 1)) for t in trips],
+        "style": [str(t.get("style", "mid")).strip().lower() for t in trips],
+        "travellers": [int(t.get("travellers", 1)) for t in trips],
+    })
+    if (frame["country"] == "").any():
+        raise ValueError("every trip needs a 'country'")
+    if (frame["days"] < 1).any() or (frame["travellers"] < 1).any():
+        raise ValueError("'days' and 'travellers' must be at least 1")
+    if not frame["style"].isin(STYLES).all():
+        raise ValueError(f"'style' must be one of {', '.join(STYLES)}")
+    frame["country"] = [destination_index.resolve(c, "country") or c for c in frame["country"]]
+    frame["city"] = [
+        destination_index.resolve(city, "city", country=country) or city if city else ""
+        for country, city in zip(frame["country"], frame["city"])
+    ]
+    return frame
+
+@app.post("/api/trip_budget")
+async def trip_budget(request: Request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return JSONResponse(content={"error": "Request body must be JSON"}, status_code=400)
+    if not isinstance(data, dict):
+        return JSONResponse(content={"error": "Request body must be a JSON object"}, status_code=400)
+    trips = data.get("trips")
+    currency = normalize_code(data.get("currency") or BASE_CURRENCY)
+    if trip_budget_estimator is None:
+        return JSONResponse(content={"error": "Cost of living data unavailable"}, status_code=503)
+    if not isinstance(trips, list) or not trips or len(trips) > MAX_TRIPS_PER_REQUEST:
+        return JSONResponse(
+            content={"error": f"'trips' must be a list of 1-{MAX_TRIPS_PER_REQUEST} destinations"},
+            status_code=400
+        )
+    try:
+        frame = parse_trips(trips)
+        factor = rate_table.factor(BASE_CURRENCY, currency)
+    except (AttributeError, TypeError, ValueError) as e:
+        return JSONResponse(content={"error": f"Invalid trip budget request: {e}"}, status_code=400)
+
+    hotel_prices = pd.DataFrame([hotel_price_band(c, city) for c, city in zip(frame["country"], frame["city"])],
+                                index=frame.index, dtype=float)
+    estimates = (trip_budget_estimator.estimate(frame, hotel_prices) * factor).round(2)
+
+    results = []
+    for trip, daily in zip(frame.to_dict("records"), estimates.to_dict("records")):
+        total = daily.pop("total")
+        daily["total"] = daily.pop("daily_total")
+        missing = [k for k in ("food", "accommodation") if math.isnan(daily[k])]
+        results.append(sanitize_for_json({
+            **trip,
+            "daily": daily,
+            "total": total,
+            "missing": [{"food": "cost_of_living", "accommodation": "hotel_prices"}[k] for k in missing],
+        }))
+    return {"trips": results, "count": len(results), "currency": currency}
+
+# --------- COST OF LIVING QUERIES ---------
+MAX_COST_OF_LIVING_ROWS = 100
+
+def parse_ranges(values, columns):
+    """'column:min:max' filters (either bound may be empty) as {column: (min, max)}"""
+    ranges = {}
+    for value in values:
+        column, _, bounds = value.partition(":")
+        low, _, high = bounds.partition(":")
+        if column not in columns:
+            raise ValueError(f"unknown column '{column}'")
+        ranges[column] = (float(low) if low else None, float(high) if high else None)
+    return ranges
+
+@app.get("/api/cost_of_living")
+async def cost_of_living_query(request: Request, sort: str = "Country", order: str = "asc",
+                               limit: int = 20, offset: int = 0, countries: str = "", fields: str = ""):
+    """
+    Countries from the cost-of-living table, e.g.
+    /api/cost_of_living?sort=Cappuccino_USD&order=desc&range=Meal_Inexpensive_Restaurant_USD:5:15&limit=10
+    Prices are in USD; values the scrape did not find are null.
+    """
+    index = cost_of_living_ranking
+    if index is None:
+        return JSONResponse(content={"error": "Cost of living data unavailable"}, status_code=503)
+    columns = set(index.columns)
+    selected = [f.strip() for f in fields.split(",") if f.strip()] or index.columns
+    unknown = [c for c in [sort] + selected if c != "Country" and c not in columns]
+    try:
+        if unknown:
+            raise ValueError(f"unknown column '{unknown[0]}'")
+        if order not in ("asc", "desc"):
+            raise ValueError("'order' must be asc or desc")
+        ranges = parse_ranges(request.query_params.getlist("range"), columns)
+    except ValueError as e:
+        return JSONResponse(
+            content={"error": f"Invalid cost of living query: {e}", "columns": index.columns},
+            status_code=400
+        )
+
+    wanted = [c.strip() for c in countries.split(",") if c.strip()] or None
+    rows, total = index.query(sort, order == "desc", ranges, wanted,
+                              limit=max(1, min(limit, MAX_COST_OF_LIVING_ROWS)), offset=max(0, offset))
+    page = index.table.iloc[rows]
+    records = sanitize_for_json(page[["Country"] + [c for c in selected if c != "Country"]].to_dict("records"))
+    for rank, record in enumerate(records, start=max(0, offset) + 1):
+        record["rank"] = rank
+    return {"results": records, "count": len(records), "total": total, "sort": sort, "order": order,
+            "currency": BASE_CURRENCY}
+
+# --------- DESTINATION AUTOCOMPLETE ---------
+@app.get("/api/destinations/autocomplete")
+async def autocomplete_destinations(q: str = "", limit: int = 10):
+    limit = max(1, min(limit, 50))
+    return {"query": q, "results": [d.as_dict() for d in destination_index.autocomplete(q, limit)]}
+
+# --------- ADMIN: PROFILING ---------
+def admin_denied(request):
+    """Error response unless the request carries ADMIN_TOKEN in X-Admin-Token"""
+    if not ADMIN_TOKEN:
+        return JSONResponse(content={"error": "Not found"}, status_code=404)
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        return JSONResponse(content={"error": "Invalid admin token"}, status_code=401)
+    return None
+
+@app.post("/admin/profile")
+async def profile_worker(request: Request, seconds: float = 10, interval_ms: float = 5, top: int = 25,
+                         memory: bool = True):
+    """
+    Profile this worker for `seconds` while it keeps serving traffic; returns the
+    top functions by CPU samples and the allocation sites that grew the most
+    """
+    denied = admin_denied(request)
+    if denied:
+        return denied
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or not 1 <= interval_ms <= 1000:
+        return JSONResponse(
+            content={"error": f"'seconds' must be 0-{MAX_PROFILE_SECONDS} and 'interval_ms' 1-1000"},
+            status_code=400
+        )
+    try:
+        report = await asyncio.to_thread(
+            profiling.profile, seconds, interval_ms / 1000, max(1, min(top, 100)), memory
+        )
+    except profiling.ProfilerBusy as e:
+        return JSONResponse(content={"error": str(e)}, status_code=409)
+    return {"pid": os.getpid(), **report}
+
+# --------- METRICS ENDPOINT ---------
+@app.get("/metrics")
+async def metrics():
+    return {
+        "prediction_cache": prediction_cache.stats(),
+        "hotel_info_coalescing": hotel_info_flight.stats(),
+        "hotel_info_not_modified": hotel_info_not_modified,
+        "hotel_info_degraded": dict(hotel_info_degraded),
+        "model_scoring_overrunning": len(overrunning_scoring),
+        "admission": admission.stats(),
+        "host_hotel_mirror": host_hotel_mirror.stats() if host_hotel_mirror else None,
+        "hotel_data": hotel_store.stats() if hotel_store else None,
+        "price_stats": price_stats.stats(),
+        "exchange_rates": rate_table.stats(),
+        "similar_hotels_indexed": len(similar_hotels)
+    }
+
 # --------- HEALTH CHECK ENDPOINT ---------
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
+    health = {
+        "status": "healthy" if startup["ready"] else "starting",
+        "startup_seconds": startup["seconds"],
         "model_loaded": model is not None,
-        "csv_data_loaded": not sample_data.empty,
+        "csv_data_loaded": hotel_store is not None and hotel_store.loaded,
         "mongodb_connected": mongodb_connected,
-        "model_features": model_features
+        "model_features": model_features,
+        "model_version": model_metadata.get("version"),
+        "model_format": model_format,
+        "prediction_threads": PREDICTION_THREADS
     }
+    # Readiness probes keep traffic away until the data is loaded
+    return health if startup["ready"] else JSONResponse(content=health, status_code=503)
 
 # --------- MAIN ENTRY POINT ---------
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=PORT, reload=True)
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Memo cache for model predictions
+
+Many hotels share the same feature vector (all host hotels use the default
+distance, CSV hotels repeat (stars, distance) pairs within a city), so scoring
+results are memoized by feature tuple. The cache is bound to a model identity
+and empties itself when a different model is used.
+"""
+import threading
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class PredictionCache:
+    """Thread-safe bounded LRU mapping feature tuples to predicted prices"""
+
+    def __init__(self, maxsize=50000, distance_step=None):
+        """
+        Args:
+            maxsize (int): Maximum number of cached feature vectors (0 disables caching)
+            distance_step (float): If set, distances are rounded to this step before
+                keying and scoring so nearby hotels share entries
+        """
+        self.maxsize = maxsize
+        self.distance_step = distance_step
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_token = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clears = 0
+
+    def bind_model(self, token):
+        """Clear the cache if predictions now come from a different model"""
+        with self._lock:
+            if token != self._model_token:
+                if self._data:
+                    self.clears += 1
+                self._data.clear()
+                self._model_token = token
+
+    def quantize(self, features, column="Distance from Center"):
+        """Round the distance column in place when quantization is enabled"""
+        if self.distance_step and column in features:
+            step = self.distance_step
+            features[column] = (features[column] / step).round() * step
+        return features
+
+    def get_many(self, keys):
+        """Cached value per key, or MISSING"""
+        results = []
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key, MISSING)
+                if value is MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self._data.move_to_end(key)
+                results.append(value)
+        return results
+
+    def put_many(self, keys, values):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.clears += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "clears": self.clears,
+            "distance_step": self.distance_step,
+        }
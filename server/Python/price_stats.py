@@ -0,0 +1,283 @@
+"""
+Per-destination price statistics
+
+Count, mean, median and p10/p90 of observed and predicted nightly prices (USD)
+for every (country, city, stars) group and its rollups (all stars, whole
+country, city in any country). Prices are kept as log-bucketed histograms
+(PriceSketch) rather than per-hotel arrays, so memory depends on the number of
+groups and not on the number of hotels, datasets can be folded in one partition
+at a time, and percentiles are within RELATIVE_ERROR of the exact values. Means
+and counts are exact. Every table row is summarized when the data loads, so
+hotel_info reads averages and price bands with a dict lookup; a host hotel
+update adjusts and re-summarizes only the rows it belongs to.
+"""
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+import hotel_features
+
+ANY = None
+PRICE_KINDS = ("observed", "predicted")
+QUANTILES = {"p10": 0.1, "median": 0.5, "p90": 0.9}
+
+# Percentiles read from a sketch are within this fraction of the exact value
+RELATIVE_ERROR = 0.01
+_GAMMA = (1 + RELATIVE_ERROR) / (1 - RELATIVE_ERROR)
+_LOG_GAMMA = math.log(_GAMMA)
+# Prices at or below this share the lowest bucket
+MIN_PRICE = 0.01
+# Multi-star lookups are merged on first use and kept until the rows under them change
+MAX_MERGED_DESTINATIONS = 10000
+
+
+def group_key(value):
+    return str(value or "").strip().lower()
+
+
+def stars_key(value):
+    try:
+        stars = float(value)
+    except (TypeError, ValueError):
+        return hotel_features.MISSING_STARS
+    return hotel_features.MISSING_STARS if np.isnan(stars) else stars
+
+
+def rollup_keys(country, city, stars):
+    """Every table key a hotel in (country, city, stars) counts towards"""
+    return [
+        (country, city, stars), (country, city, ANY),
+        (country, ANY, stars), (country, ANY, ANY),
+        (ANY, city, stars), (ANY, city, ANY),
+    ]
+
+
+def summarize(values):
+    """Stats for one array of prices; NaN entries are ignored"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"count": 0, "mean": None, "p10": None, "median": None, "p90": None}
+    p10, median, p90 = np.quantile(values, list(QUANTILES.values()))
+    return {
+        "count": int(len(values)),
+        "mean": round(float(values.mean()), 2),
+        "p10": round(float(p10), 2),
+        "median": round(float(median), 2),
+        "p90": round(float(p90), 2),
+    }
+
+
+class PriceSketch:
+    """
+    Histogram of prices over logarithmic buckets, stored sparsely: its size is
+    bounded by the number of buckets the price range spans, however many
+    prices it holds. Sketches merge exactly and support single adds/removes.
+    """
+
+    __slots__ = ("bins", "counts", "count", "total")
+
+    def __init__(self, bins=None, counts=None, count=0, total=0.0):
+        self.bins = np.empty(0, dtype=np.int32) if bins is None else bins
+        self.counts = np.empty(0, dtype=np.int64) if counts is None else counts
+        self.count = count
+        self.total = total
+
+    @staticmethod
+    def bucket(values):
+        return np.ceil(np.log(np.maximum(values, MIN_PRICE)) / _LOG_GAMMA).astype(np.int32)
+
+    @classmethod
+    def of(cls, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return cls()
+        bins, counts = np.unique(cls.bucket(values), return_counts=True)
+        return cls(bins, counts.astype(np.int64), len(values), float(values.sum()))
+
+    @classmethod
+    def merge(cls, sketches):
+        sketches = [s for s in sketches if s.count]
+        if len(sketches) <= 1:
+            return cls(*(sketches[0].copy_state() if sketches else ()))
+        bins, inverse = np.unique(np.concatenate([s.bins for s in sketches]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([s.counts for s in sketches])).astype(np.int64)
+        return cls(bins.astype(np.int32), counts, sum(s.count for s in sketches), sum(s.total for s in sketches))
+
+    def copy_state(self):
+        return self.bins.copy(), self.counts.copy(), self.count, self.total
+
+    def add(self, value, sign=1):
+        """Add (sign=1) or remove (sign=-1) one price; NaN is ignored"""
+        if value is None or not math.isfinite(value):
+            return
+        b = int(self.bucket(value))
+        i = int(np.searchsorted(self.bins, b))
+        if i < len(self.bins) and self.bins[i] == b:
+            self.counts[i] += sign
+            if not self.counts[i]:
+                self.bins, self.counts = np.delete(self.bins, i), np.delete(self.counts, i)
+        elif sign > 0:
+            self.bins, self.counts = np.insert(self.bins, i, b), np.insert(self.counts, i, 1)
+        else:
+            return
+        self.count += sign
+        self.total += sign * value
+
+    def summary(self):
+        if not self.count:
+            return summarize([])
+        cumulative = np.cumsum(self.counts)
+        midpoints = 2 * _GAMMA ** self.bins.astype(float) / (_GAMMA + 1)
+        # Interpolate between the buckets holding the neighbouring ranks, as np.quantile does
+        ranks = np.array(list(QUANTILES.values())) * (self.count - 1)
+        below = midpoints[np.searchsorted(cumulative, np.floor(ranks), side="right")]
+        above = midpoints[np.searchsorted(cumulative, np.ceil(ranks), side="right")]
+        p10, median, p90 = below + (above - below) * (ranks - np.floor(ranks))
+        return {
+            "count": int(self.count),
+            "mean": round(self.total / self.count, 2),
+            "p10": round(float(p10), 2),
+            "median": round(float(median), 2),
+            "p90": round(float(p90), 2),
+        }
+
+
+def group_sketches(frame):
+    """
+    Finest (country, city, stars) group -> {"hotels", "observed", "predicted"}
+    for a frame carrying Country, City/Place, Stars, the observed price column
+    and a "Predicted Price" column. Partitions are folded in one at a time.
+    """
+    df = pd.DataFrame({
+        "country": frame["Country"].astype("string").fillna("").str.strip().str.lower(),
+        "city": frame["City/Place"].astype("string").fillna("").str.strip().str.lower(),
+        "stars": frame["Stars"].astype(float).fillna(hotel_features.MISSING_STARS),
+        "observed": frame[hotel_features.TARGET].astype(float),
+        "predicted": frame["Predicted Price"].astype(float),
+    })
+    prices = {kind: df[kind].to_numpy() for kind in PRICE_KINDS}
+    return {
+        group: {"hotels": len(positions), **{kind: PriceSketch.of(prices[kind][positions]) for kind in PRICE_KINDS}}
+        for group, positions in df.groupby(["country", "city", "stars"], sort=False).indices.items()
+    }
+
+
+def _merge_entries(entries):
+    entries = [e for e in entries if e is not None]
+    return {
+        "hotels": sum(e["hotels"] for e in entries),
+        **{kind: PriceSketch.merge([e[kind] for e in entries]) for kind in PRICE_KINDS},
+    }
+
+
+def _row(entry):
+    return {"hotels": entry["hotels"], **{kind: entry[kind].summary() for kind in PRICE_KINDS}}
+
+
+class PriceStats:
+    def __init__(self):
+        self._rows = {}
+        # Table key -> {"hotels": n, "observed": PriceSketch, "predicted": PriceSketch}
+        self._sketches = {}
+        # Host hotel id -> (finest group, predicted price)
+        self._host = {}
+        # (country, city) -> {star tuple: row} for lookups of several star ratings
+        self._merged = {}
+        self._lock = threading.Lock()
+        self.host_updates = 0
+
+    def build(self, partials):
+        """Build the table from group_sketches() results, one per dataset partition"""
+        grouped = {}
+        for partial in partials:
+            for group, entry in partial.items():
+                for key in rollup_keys(*group):
+                    grouped.setdefault(key, []).append(entry)
+        sketches = {key: _merge_entries(entries) for key, entries in grouped.items()}
+        del grouped
+
+        with self._lock:
+            # Host hotels survive a dataset rebuild
+            for group, predicted in self._host.values():
+                self._apply(sketches, group, predicted, 1)
+            self._sketches = sketches
+            self._rows = {key: _row(entry) for key, entry in sketches.items()}
+            self._merged = {}
+
+    # --------- HOST HOTEL UPDATES ---------
+    def set_host(self, hotel_id, country, city, stars, predicted):
+        """Add or move a host hotel; host prices are not in USD, so only the prediction counts"""
+        group = (group_key(country), group_key(city), stars_key(stars))
+        predicted = np.nan if predicted is None else float(predicted)
+        with self._lock:
+            old = self._host.pop(hotel_id, None)
+            if old is not None:
+                self._refresh(self._apply(self._sketches, *old, -1))
+            self._host[hotel_id] = (group, predicted)
+            self._refresh(self._apply(self._sketches, group, predicted, 1))
+            self.host_updates += 1
+
+    def remove_host(self, hotel_id):
+        with self._lock:
+            old = self._host.pop(hotel_id, None)
+            if old is None:
+                return
+            self._refresh(self._apply(self._sketches, *old, -1))
+            self.host_updates += 1
+
+    @staticmethod
+    def _apply(sketches, group, predicted, sign):
+        """Add or remove one host hotel in every row it counts towards; returns those keys"""
+        keys = rollup_keys(*group)
+        for key in keys:
+            entry = sketches.get(key)
+            if entry is None:
+                entry = sketches[key] = {"hotels": 0, **{kind: PriceSketch() for kind in PRICE_KINDS}}
+            entry["hotels"] += sign
+            entry["predicted"].add(predicted, sign)
+            if entry["hotels"] <= 0:
+                del sketches[key]
+        return keys
+
+    def _refresh(self, keys):
+        for key in keys:
+            entry = self._sketches.get(key)
+            if entry is None:
+                self._rows.pop(key, None)
+            else:
+                self._rows[key] = _row(entry)
+            self._merged.pop(key[:2], None)
+
+    # --------- LOOKUPS ---------
+    def lookup(self, country="", city="", stars=()):
+        """Stats for the same filters hotel_info applies, or None if nothing matches"""
+        country = group_key(country) or ANY
+        city = group_key(city) or ANY
+        if len(stars) <= 1:
+            return self._rows.get((country, city, stars[0] if stars else ANY))
+        # Several star ratings: merge the per-star sketches once, then serve the merged row
+        stars = tuple(sorted({float(s) for s in stars}))
+        with self._lock:
+            merged = self._merged.get((country, city))
+            if merged is not None and stars in merged:
+                return merged[stars]
+            entries = [self._sketches.get((country, city, s)) for s in stars]
+            row = _row(_merge_entries(entries)) if any(entries) else None
+            if merged is None:
+                if len(self._merged) >= MAX_MERGED_DESTINATIONS:
+                    self._merged = {}
+                merged = self._merged[(country, city)] = {}
+            merged[stars] = row
+        return row
+
+    def stats(self):
+        return {
+            "groups": len(self._rows),
+            "host_hotels": len(self._host),
+            "host_updates": self.host_updates,
+            "sketch_buckets": sum(len(e[kind].bins) for e in self._sketches.values() for kind in PRICE_KINDS),
+        }
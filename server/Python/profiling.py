@@ -0,0 +1,151 @@
+"""
+On-demand CPU and memory profiling of a running worker
+
+profile() samples the Python stacks of every thread (sys._current_frames) at a
+fixed interval and, optionally, traces allocations with tracemalloc for the
+same window. Nothing is installed until a profile is requested and everything
+is removed when it ends, so the idle cost is zero. Sampling sees all threads,
+including the worker threads hotel_info computes in, which cProfile (one
+thread per profiler) would miss.
+"""
+import os
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# Leaf frames of threads that are parked rather than working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+}
+
+_lock = threading.Lock()
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def short_path(filename):
+    """Path relative to site-packages, the stdlib or the working directory, for readable reports"""
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    if filename.startswith(_STDLIB):
+        return filename[len(_STDLIB):]
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        return filename
+    return filename if relative.startswith("..") else relative
+
+
+def _function_key(code):
+    return f"{short_path(code.co_filename)}:{code.co_firstlineno} {code.co_name}"
+
+
+def sample_stacks(seconds, interval):
+    """Self and cumulative sample counts per function across all threads except this one"""
+    own = threading.get_ident()
+    self_counts, total_counts = Counter(), Counter()
+    samples = idle = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                idle += 1
+                continue
+            samples += 1
+            self_counts[_function_key(code)] += 1
+            seen = set()
+            while frame is not None:
+                key = _function_key(frame.f_code)
+                if key not in seen:
+                    seen.add(key)
+                    total_counts[key] += 1
+                frame = frame.f_back
+        time.sleep(interval)
+    return samples, idle, self_counts, total_counts
+
+
+def _allocation_report(start, end, top):
+    # Leave out the profiler's own bookkeeping
+    own = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+    diffs = end.filter_traces(own).compare_to(start.filter_traces(own), "lineno")
+    diffs.sort(key=lambda stat: stat.size_diff, reverse=True)
+    return [
+        {
+            "site": f"{short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in diffs[:top]
+    ]
+
+
+def profile(seconds=10.0, interval=0.005, top=25, memory=True):
+    """
+    Profile the process for `seconds` and return the top functions by samples
+    and, with memory=True, the allocation sites that grew most in the window.
+    Only one profile runs at a time; a second caller gets ProfilerBusy.
+    """
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy("a profile is already running")
+    started_tracing = False
+    try:
+        start_snapshot = None
+        if memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(1)
+            tracemalloc.reset_peak()
+            start_snapshot = tracemalloc.take_snapshot()
+
+        started = time.perf_counter()
+        samples, idle, self_counts, total_counts = sample_stacks(seconds, interval)
+        elapsed = time.perf_counter() - started
+
+        report = {
+            "seconds": round(elapsed, 2),
+            "interval_ms": round(interval * 1000, 2),
+            "samples": samples,
+            "idle_samples": idle,
+            "cpu": [
+                {
+                    "function": key,
+                    "self": count,
+                    "self_pct": round(100 * count / samples, 1),
+                    "total": total_counts[key],
+                    "total_pct": round(100 * total_counts[key] / samples, 1),
+                }
+                for key, count in self_counts.most_common(top)
+            ],
+            "cumulative": [
+                {"function": key, "total": count, "total_pct": round(100 * count / samples, 1)}
+                for key, count in total_counts.most_common(top)
+            ],
+        }
+        if memory:
+            end_snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            report["memory"] = {
+                "traced_kb": round(current / 1024, 1),
+                "peak_kb": round(peak / 1024, 1),
+                "top": _allocation_report(start_snapshot, end_snapshot, top),
+            }
+        return report
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _lock.release()
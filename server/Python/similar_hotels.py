@@ -0,0 +1,128 @@
+"""
+Nearest-neighbour index over dataset hotels for "similar hotels" lookups
+
+Each hotel becomes a small feature vector (stars, distance from centre, log
+predicted price, rating and target encodings of its city and country), scaled
+to unit variance and weighted. A KD-tree over the vectors answers k-NN queries
+in well under a millisecond at the current dataset size.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+import hotel_features
+from destinations import fold
+
+# Relative importance of each feature after scaling
+FEATURE_WEIGHTS = {
+    "stars": 1.5,
+    "distance": 0.7,
+    "log_price": 2.0,
+    "rating": 0.5,
+    "city_price": 1.0,
+    "country_price": 0.5,
+}
+
+RESULT_COLUMNS = ["Country", "City/Place", "Hotel Name", "Stars", "Location", "Distance from Center",
+                  hotel_features.TARGET, "Predicted Price"]
+
+_RATING_PATTERN = re.compile(r"(\d+(?:\.\d+)?)")
+
+
+def parse_rating(values):
+    """Numeric review score from strings like "8.4" or "Scored 8.4"; NaN when absent"""
+    return values.astype("string").str.extract(_RATING_PATTERN, expand=False).astype(float)
+
+
+class SimilarHotelIndex:
+    def __init__(self, frame=None):
+        """
+        Args:
+            frame: dataset hotels with RESULT_COLUMNS plus Rating; "Predicted Price" in USD
+        """
+        self.tree = None
+        self.hotels = pd.DataFrame(columns=RESULT_COLUMNS)
+        self._by_name = {}
+        if frame is not None and len(frame):
+            self._build(frame.reset_index(drop=True))
+
+    def __len__(self):
+        return len(self.hotels)
+
+    def _build(self, frame):
+        price = frame["Predicted Price"].astype(float).fillna(frame[hotel_features.TARGET].astype(float))
+        log_price = np.log1p(price.clip(lower=0))
+        log_price = log_price.fillna(log_price.median())
+        city = frame["City/Place"].astype("string").fillna("").str.lower()
+        country = frame["Country"].astype("string").fillna("").str.lower()
+
+        columns = {
+            "stars": frame["Stars"].astype(float).fillna(frame["Stars"].median()),
+            "distance": hotel_features.parse_distance_series(frame["Distance from Center"]),
+            "log_price": log_price,
+            "rating": parse_rating(frame["Rating"]) if "Rating" in frame else pd.Series(np.nan, index=frame.index),
+            # Target encodings place cities and countries with similar price levels near each other
+            "city_price": log_price.groupby(city).transform("mean"),
+            "country_price": log_price.groupby(country).transform("mean"),
+        }
+        matrix = np.column_stack([
+            col.fillna(col.median()).fillna(0).to_numpy(dtype=float) for col in columns.values()
+        ])
+        std = matrix.std(axis=0)
+        std[std == 0] = 1.0
+        self._mean = matrix.mean(axis=0)
+        self._scale = np.array(list(FEATURE_WEIGHTS.values())) / std
+        self._scaled = (matrix - self._mean) * self._scale
+        # Imported here so the API starts without paying for sklearn until the index is built
+        from sklearn.neighbors import KDTree
+        self.tree = KDTree(self._scaled)
+
+        self.hotels = frame[RESULT_COLUMNS].copy()
+        self.hotels["Predicted Price"] = price
+        self._price = price.to_numpy(dtype=float)
+        self._city_rows = {c: rows for c, rows in city.groupby(city).indices.items()}
+        self._city = city.to_numpy()
+        # The dataset lists some hotels more than once; results show each hotel once
+        keys = [(fold(c), fold(name)) for c, name in zip(city, frame["Hotel Name"].astype("string").fillna(""))]
+        self._hotel_key = pd.factorize(pd.Series(keys, dtype=object))[0]
+        self._by_name = {}
+        for i, key in enumerate(keys):
+            self._by_name.setdefault(key, i)
+
+    def find(self, hotel_name, city):
+        """Row id of a dataset hotel by name and city, or None"""
+        return self._by_name.get((fold(city), fold(hotel_name)))
+
+    def similar(self, hotel_id, k=10, cheaper=False, same_city=False):
+        """
+        The k hotels closest to hotel_id, nearest first, as (row id, distance).
+        cheaper keeps only hotels with a lower predicted price; same_city keeps
+        only hotels in the anchor's city.
+        """
+        if self.tree is None:
+            return []
+        query = self._scaled[hotel_id]
+        if same_city:
+            # A city is small enough to compare against every hotel in it directly
+            ids = self._city_rows[self._city[hotel_id]]
+            distances = np.sqrt(((self._scaled[ids] - query) ** 2).sum(axis=1))
+            order = np.argsort(distances, kind="stable")
+            return self._select(hotel_id, ids[order], distances[order], k, cheaper)
+
+        fetch = k + 1
+        while True:
+            fetch = min(fetch * (4 if cheaper else 2), len(self.hotels))
+            distances, ids = self.tree.query(query.reshape(1, -1), k=fetch)
+            results = self._select(hotel_id, ids[0], distances[0], k, cheaper)
+            if len(results) >= k or fetch == len(self.hotels):
+                return results
+
+    def _select(self, hotel_id, ids, distances, k, cheaper):
+        keep = self._hotel_key[ids] != self._hotel_key[hotel_id]
+        if cheaper:
+            keep &= self._price[ids] < self._price[hotel_id]
+        ids, distances = ids[keep], distances[keep]
+        _, first = np.unique(self._hotel_key[ids], return_index=True)
+        first.sort()
+        return list(zip(ids[first][:k].tolist(), distances[first][:k].tolist()))
@@ -0,0 +1,47 @@
+"""
+Request coalescing ("single flight") for identical concurrent work
+
+The first request for a key starts the computation in a worker thread; requests
+for the same key arriving while it runs await that same result instead of
+repeating the work. Nothing is kept once the computation finishes, so this is
+independent of any result caching.
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self, name="singleflight"):
+        self.name = name
+        self._inflight = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def run(self, key, fn, *args):
+        """Run fn(*args) in a thread, sharing the result with concurrent callers of the same key"""
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+        else:
+            self.coalesced += 1
+        # shield: a caller that disconnects must not cancel the work others are waiting on
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    def stats(self):
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "computations": self.leaders,
+            "coalesced_requests": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+            "failures": self.failures,
+        }
@@ -0,0 +1,134 @@
+"""
+Train the hotel price model from the command line
+
+Replaces the cells in ML/modelforHotels/hotels.ipynb. Loads the dataset with the
+same typed loader as the API, prepares features with vectorized ops and writes a
+versioned model plus a metadata file that main.py reads at startup.
+
+Run from the server directory:
+    python Python/train_hotel_model.py --threads 4
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+from catboost import CatBoostRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+import hotel_data
+import hotel_features
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "hotel_price_model"
+
+
+def prepare_training_frame(df):
+    """Clean the raw dataset into model features plus target; returns (frame, default_distance)"""
+    df = df.copy()
+    df["Distance from Center"] = hotel_features.parse_distance_series(df["Distance from Center"], default=np.nan)
+    default_distance = float(df["Distance from Center"].median())
+    df["Distance from Center"] = df["Distance from Center"].fillna(default_distance)
+    df["Stars"] = df["Stars"].fillna(hotel_features.MISSING_STARS)
+
+    # Impute missing prices from the (city, stars) median, then the city median
+    target = hotel_features.TARGET
+    city = df["City/Place"].astype(str)
+    df[target] = df[target].fillna(df.groupby([city, df["Stars"]])[target].transform("median"))
+    df[target] = df[target].fillna(df.groupby(city)[target].transform("median"))
+    df = df[df[target].notna() & (df[target] > 0)]
+    return df, default_distance
+
+
+def train(args):
+    start = time.perf_counter()
+    df = hotel_data.load_hotels_dataset(args.data)
+    df, default_distance = prepare_training_frame(df)
+    logger.info(f"Training on {len(df)} hotels (distance default {default_distance:.2f} km)")
+
+    X = hotel_features.build_feature_frame(df, default_distance=default_distance)
+    y = hotel_features.transform_target(df[hotel_features.TARGET])
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=args.seed)
+
+    # CatBoost's training logs go to a scratch dir so the tracked catboost_info is left alone
+    with tempfile.TemporaryDirectory(prefix="catboost_info-") as train_dir:
+        model = CatBoostRegressor(
+            iterations=args.iterations,
+            thread_count=args.threads,
+            random_seed=args.seed,
+            train_dir=train_dir,
+            verbose=100,
+        )
+        model.fit(X_train, y_train, cat_features=hotel_features.CAT_FEATURES)
+
+    y_true = hotel_features.inverse_target(y_test)
+    y_pred = hotel_features.inverse_target(model.predict(X_test))
+    valid = ~np.isnan(y_true) & ~np.isnan(y_pred)
+    mae = float(mean_absolute_error(y_true[valid], y_pred[valid]))
+    training_seconds = time.perf_counter() - start
+    logger.info(f"MAE: {mae:.2f} USD, trained in {training_seconds:.1f}s")
+
+    version = args.version or datetime.now().strftime("%Y%m%d%H%M%S")
+    os.makedirs(args.output_dir, exist_ok=True)
+    model_path = os.path.join(args.output_dir, f"{MODEL_NAME}-{version}.pkl")
+    joblib.dump(model, model_path)
+    # CatBoost's own format loads without unpickling the Python wrapper
+    native_path = os.path.join(args.output_dir, f"{MODEL_NAME}-{version}.cbm")
+    model.save_model(native_path, format="cbm")
+
+    metadata = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "model_file": os.path.basename(model_path),
+        "native_model_file": os.path.basename(native_path),
+        "features": hotel_features.FEATURES,
+        "cat_features": hotel_features.CAT_FEATURES,
+        "target": hotel_features.TARGET,
+        "target_transform": hotel_features.TARGET_TRANSFORM,
+        "default_distance": default_distance,
+        "dataset": {
+            "path": args.data,
+            "sha256": hotel_data.file_sha256(args.data),
+            "rows": len(df),
+            "train_rows": len(X_train),
+            "test_rows": len(X_test),
+        },
+        "params": {"iterations": args.iterations, "threads": args.threads, "seed": args.seed},
+        "training_seconds": round(training_seconds, 2),
+        "metrics": {"mae": round(mae, 4)},
+    }
+    metadata_path = os.path.join(args.output_dir, f"{MODEL_NAME}-{version}.json")
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    # Unversioned copies are what the API loads
+    shutil.copyfile(model_path, os.path.join(args.output_dir, f"{MODEL_NAME}.pkl"))
+    shutil.copyfile(native_path, os.path.join(args.output_dir, f"{MODEL_NAME}.cbm"))
+    shutil.copyfile(metadata_path, os.path.join(args.output_dir, f"{MODEL_NAME}.json"))
+    logger.info(f"Saved model version {version} to {args.output_dir}")
+    return metadata
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the hotel price model")
+    parser.add_argument("--data", default=hotel_data.DEFAULT_DATASET_PATH, help="Hotel dataset CSV")
+    parser.add_argument("--output-dir", default="ML/modelforHotels", help="Where model artifacts are written")
+    parser.add_argument("--threads", type=int, default=-1, help="CatBoost thread count (-1 = all cores)")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--test-size", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--version", help="Artifact version (defaults to a timestamp)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    train(parse_args())
@@ -0,0 +1,133 @@
+import logging
+import os
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Requests dropped in lean mode: images, media, fonts and a fixed list of common third-party
+# trackers. This is not origin-based blocking; other third-party scripts and XHRs still load.
+# Network.setBlockedURLs only takes patterns, and failing every non-target host would need
+# Fetch.requestPaused events, which execute_cdp_cmd can't receive. It would also break the
+# sites' first-party CDNs, which are on other hosts (bstatic.com for Booking).
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m3u8",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*adservice.google.*", "*facebook.net*", "*facebook.com/tr*",
+    "*hotjar.com*", "*criteo.com*", "*criteo.net*", "*taboola.com*", "*outbrain.com*",
+    "*scorecardresearch.com*", "*quantserve.com*", "*bing.com/action*", "*clarity.ms*",
+    "*tiktok.com*", "*snapchat.com*", "*pinterest.com*",
+]
+
+PAGE_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+const first = !window.__bagragiMetricsSeen;
+if (nav && first) { bytes += nav.transferSize || 0; }
+window.__bagragiMetricsSeen = true;
+performance.clearResourceTimings();
+return {
+    dom_content_loaded_ms: nav && first ? nav.domContentLoadedEventEnd - nav.startTime : null,
+    load_ms: nav && first && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+    bytes: bytes,
+    resources: resources.length
+};
+"""
+
+
+def build_chrome_options(headless=True, lean=False, profile_dir=None):
+    """Chrome options shared by the scrapers, optionally in lean mode"""
+    options = Options()
+
+    if headless:
+        options.add_argument('--headless')
+
+    # Anti-detection measures
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f'--user-agent={USER_AGENT}')
+
+    if lean:
+        # Hand control back once the DOM is ready instead of waiting for every subresource
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+
+    if profile_dir:
+        # Reusing a profile keeps cookies (consent banners) and the HTTP cache warm across runs.
+        # A profile can only be used by one browser at a time.
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f'--user-data-dir={os.path.abspath(profile_dir)}')
+
+    return options
+
+
+def create_chrome_driver(headless=True, lean=False, profile_dir=None):
+    """Launch Chrome with the shared options; lean mode blocks BLOCKED_URL_PATTERNS, not all third parties"""
+    options = build_chrome_options(headless, lean, profile_dir)
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+    return driver
+
+
+class PageLoadMonitor:
+    """
+    Collects per-page load time and transferred bytes from the browser's
+    Performance API so full and lean runs can be compared
+    """
+
+    def __init__(self, mode="full", logger=None):
+        self.mode = mode
+        self.logger = logger or logging.getLogger(__name__)
+        self.pages = []
+
+    def record(self, driver, label=""):
+        """Sample metrics for the page currently loaded in the driver"""
+        try:
+            metrics = driver.execute_script(PAGE_METRICS_SCRIPT) or {}
+        except Exception as e:
+            self.logger.debug(f"Could not read page metrics for {label}: {e}")
+            return None
+        metrics["label"] = label
+        self.pages.append(metrics)
+        return metrics
+
+    def report(self):
+        """Return average load time and bandwidth across recorded pages"""
+        load_times = [p["dom_content_loaded_ms"] for p in self.pages if p.get("dom_content_loaded_ms")]
+        total_bytes = sum(p.get("bytes") or 0 for p in self.pages)
+        return {
+            "mode": self.mode,
+            "pages": len(self.pages),
+            "avg_dom_content_loaded_ms": round(sum(load_times) / len(load_times), 1) if load_times else None,
+            "avg_kb_per_page": round(total_bytes / len(self.pages) / 1024, 1) if self.pages else None,
+            "total_mb": round(total_bytes / (1024 * 1024), 2),
+        }
+
+    def log_report(self):
+        """Log the page load summary for this run"""
+        report = self.report()
+        self.logger.info(
+            f"Page loads ({report['mode']} mode): {report['pages']} pages, "
+            f"avg {report['avg_dom_content_loaded_ms']} ms to DOM ready, "
+            f"avg {report['avg_kb_per_page']} KB per page, {report['total_mb']} MB total"
+        )
+        return report
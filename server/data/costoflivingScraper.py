@@ -1,22 +1,22 @@
-import time
-import random
 import pandas as pd
-import numpy as np
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 import logging
 from datetime import datetime
-import json
+import os
 import re
 from typing import List, Dict, Any, Tuple
 from enum import Enum
 
+from browser import PageLoadMonitor, create_chrome_driver
+from ratecontroller import AdaptiveRateController
+from replay import PageRecorder
+from records import CostOfLivingRecord, INDICATOR_COLUMNS, cost_of_living_to_frame, write_json
+from runreport import RunProfiler, report_path_for
+
 class NumbeoXPath(Enum):
     COST_OF_LIVING_INDEX = "//td[contains(text(), 'Cost of Living Index')]/following-sibling::td"
     RENT_INDEX = "//td[contains(text(), 'Rent Index')]/following-sibling::td"
@@ -26,11 +26,17 @@ class NumbeoXPath(Enum):
     LOCAL_PURCHASING_POWER_INDEX = "//td[contains(text(), 'Local Purchasing Power Index')]/following-sibling::td"
 
 class CostOfLivingScraper:
-    def __init__(self, headless: bool = True, delay_range: Tuple[int, int] = (2, 5)):
+    def __init__(self, headless: bool = True, delay_range: Tuple[int, int] = (2, 5),
+                 lean: bool = False, profile_dir: str | None = None,
+                 record_dir: str | None = None, driver: Any = None):
         self.setup_logging()
         self.delay_range = delay_range
-        self.driver = self.setup_driver(headless)
-        self.cost_data: List[Dict[str, Any]] = []
+        self.rate_controller = AdaptiveRateController(delay_range, logger=self.logger)
+        self.page_monitor = PageLoadMonitor("lean" if lean else "full", logger=self.logger)
+        self.profiler = RunProfiler(record_label="countries", logger=self.logger)
+        self.recorder = PageRecorder(record_dir) if record_dir else None
+        self.driver = driver or self.setup_driver(headless, lean, profile_dir)
+        self.cost_data: List[CostOfLivingRecord] = []
 
     def setup_logging(self) -> None:
         logging.basicConfig(
@@ -43,78 +49,61 @@ class CostOfLivingScraper:
         )
         self.logger = logging.getLogger(__name__)
 
-    def setup_driver(self, headless: bool) -> webdriver.Chrome:
-        options = Options()
-        if headless:
-            options.add_argument('--headless')
-
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        return driver
+    def setup_driver(self, headless: bool, lean: bool = False, profile_dir: str | None = None) -> webdriver.Chrome:
+        return create_chrome_driver(headless, lean=lean, profile_dir=profile_dir)
 
-    def random_delay(self) -> None:
-        delay = random.uniform(*self.delay_range)
-        time.sleep(delay)
+    def throttle(self) -> None:
+        with self.profiler.phase("sleep"):
+            self.rate_controller.wait()
 
-    def scrape_numbeo_data(self, countries: List[str]) -> List[Dict[str, Any]]:
+    def scrape_numbeo_data(self, countries: List[str]) -> List[CostOfLivingRecord]:
         self.logger.info("Starting to scrape Numbeo cost of living data")
         base_url = "https://www.numbeo.com/cost-of-living/country_result.jsp?country="
+        self.rate_controller.reset()
+        self.page_monitor.pages.clear()
+        self.profiler.reset()
 
         for country in countries:
             try:
                 self.logger.info(f"Scraping cost of living for {country}")
+                self.profiler.set_context(country=country)
+                self.profiler.count("pages")
                 country_url = country.replace(" ", "+")
                 url = f"{base_url}{country_url}"
                 
-                self.driver.get(url)
-                self.random_delay()
+                with self.profiler.phase("navigation"), self.rate_controller.track():
+                    self.driver.get(url)
+                self.throttle()
+                self.page_monitor.record(self.driver, country)
                 
                 country_data = self.extract_numbeo_data(country)
+                if self.recorder:
+                    self.recorder.save(self.driver, "cost_of_living", country,
+                                       country=country, records=1 if country_data else 0)
                 if country_data:
                     self.cost_data.append(country_data)
+                    self.profiler.count("countries")
                     self.logger.info(f"Successfully scraped {country}")
                 else:
+                    self.profiler.count("empty_countries")
                     self.logger.warning(f"No data found for {country}")
             except Exception as e:
                 self.logger.error(f"Error scraping {country}: {e}")
+                self.profiler.count("country_failures")
                 continue
+        self.rate_controller.log_report()
+        self.page_monitor.log_report()
         return self.cost_data
 
-    def extract_numbeo_data(self, country: str) -> Dict[str, Any] | None:
+    def extract_numbeo_data(self, country: str) -> CostOfLivingRecord | None:
         try:
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "data_wide_table"))
-            )
-            
-            data: Dict[str, Any] = {
-                "Country": country,
-                "Scraped_Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "Source": "Numbeo"
-            }
+            with self.profiler.phase("wait_for_table"), self.rate_controller.track():
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "data_wide_table"))
+                )
             
-            for index_name, xpath_enum in {
-                "Cost_of_Living_Index": NumbeoXPath.COST_OF_LIVING_INDEX,
-                "Rent_Index": NumbeoXPath.RENT_INDEX,
-                "Cost_of_Living_Plus_Rent_Index": NumbeoXPath.COST_PLUS_RENT_INDEX,
-                "Groceries_Index": NumbeoXPath.GROCERIES_INDEX,
-                "Restaurant_Price_Index": NumbeoXPath.RESTAURANT_PRICE_INDEX,
-                "Local_Purchasing_Power_Index": NumbeoXPath.LOCAL_PURCHASING_POWER_INDEX,
-            }.items():
-                try:
-                    element = self.driver.find_element(By.XPATH, xpath_enum.value)
-                    data[index_name] = self.clean_numeric(element.text)
-                except NoSuchElementException:
-                    data[index_name] = "N/A"
-            
-            data.update(self.extract_detailed_costs())
-            return data
+            with self.profiler.phase("extraction"):
+                return self.extract_country_values(country)
         except TimeoutException:
             self.logger.error(f"Timeout waiting for data table for {country}")
             return None
@@ -122,8 +111,28 @@ class CostOfLivingScraper:
             self.logger.error(f"Error extracting data for {country}: {e}")
             return None
 
-    def extract_detailed_costs(self) -> Dict[str, Any]:
-        detailed_costs: Dict[str, Any] = {}
+    def extract_country_values(self, country: str) -> CostOfLivingRecord:
+        record = CostOfLivingRecord.empty(country, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "Numbeo")
+        
+        for index_name, xpath_enum in {
+            "Cost_of_Living_Index": NumbeoXPath.COST_OF_LIVING_INDEX,
+            "Rent_Index": NumbeoXPath.RENT_INDEX,
+            "Cost_of_Living_Plus_Rent_Index": NumbeoXPath.COST_PLUS_RENT_INDEX,
+            "Groceries_Index": NumbeoXPath.GROCERIES_INDEX,
+            "Restaurant_Price_Index": NumbeoXPath.RESTAURANT_PRICE_INDEX,
+            "Local_Purchasing_Power_Index": NumbeoXPath.LOCAL_PURCHASING_POWER_INDEX,
+        }.items():
+            try:
+                element = self.driver.find_element(By.XPATH, xpath_enum.value)
+                record.set(index_name, self.clean_numeric(element.text))
+            except NoSuchElementException:
+                pass
+        
+        record.update(self.extract_detailed_costs())
+        return record
+
+    def extract_detailed_costs(self) -> Dict[str, float | None]:
+        detailed_costs: Dict[str, float | None] = {}
         cost_items = {
             "Meal_Inexpensive_Restaurant_USD": "Meal, Inexpensive Restaurant",
             "Meal_for_2_Mid_Range_Restaurant_USD": "Meal for 2 People, Mid-range Restaurant",
@@ -178,12 +187,12 @@ class CostOfLivingScraper:
                 cost_element = self.driver.find_element(By.XPATH, f"//td[contains(text(), '{search_text}')]/following-sibling::td")
                 detailed_costs[key] = self.clean_numeric(cost_element.text)
             except NoSuchElementException:
-                detailed_costs[key] = "N/A"
+                detailed_costs[key] = None
         return detailed_costs
 
-    def clean_numeric(self, value: str) -> float | str:
+    def clean_numeric(self, value: str) -> float | None:
         if not value or value.strip().upper() == "N/A":
-            return "N/A"
+            return None
         
         numeric_value = re.sub(r'[^\d.,]', '', value)
         numeric_value = numeric_value.replace(',', '')
@@ -191,46 +200,44 @@ class CostOfLivingScraper:
         try:
             return float(numeric_value)
         except ValueError:
-            return "N/A"
+            return None
 
     def scrape_alternative_sources(self, countries: List[str]) -> None:
         self.logger.info("Scraping alternative cost of living sources")
         for country in countries:
             try:
                 additional_data = self.get_economic_indicators(country)
-                for i, data in enumerate(self.cost_data):
-                    if data["Country"] == country:
-                        self.cost_data[i].update(additional_data)
+                for record in self.cost_data:
+                    if record.country == country:
+                        record.update(additional_data)
                         break
             except Exception as e:
                 self.logger.error(f"Error getting additional data for {country}: {e}")
                 continue
 
-    def get_economic_indicators(self, country: str) -> Dict[str, Any]:
-        return {
-            "GDP_Per_Capita_USD": "N/A",
-            "Inflation_Rate_Percent": "N/A",
-            "Unemployment_Rate_Percent": "N/A",
-            "Average_Monthly_Salary_USD": "N/A",
-            "Minimum_Wage_USD": "N/A"
-        }
+    def get_economic_indicators(self, country: str) -> Dict[str, float | None]:
+        # No indicator source is wired up yet
+        return {column: None for column in INDICATOR_COLUMNS}
 
     def save_data(self, filename: str = "cost_of_living_dataset.csv", save_json: bool = True) -> None:
         if not self.cost_data:
             self.logger.warning("No data to save")
             return
             
-        df = pd.DataFrame(self.cost_data)
+        df = cost_of_living_to_frame(self.cost_data)
         df.to_csv(filename, index=False)
         self.logger.info(f"Data saved to {filename}")
         
         if save_json:
             json_filename = filename.replace('.csv', '.json')
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(self.cost_data, f, indent=2, ensure_ascii=False)
+            write_json(df, json_filename)
             self.logger.info(f"Data also saved to {json_filename}")
             
         self.print_summary(df)
+        self.profiler.write(report_path_for(filename), extra={
+            "pacing": self.rate_controller.report(),
+            "page_loads": self.page_monitor.report(),
+        })
 
     def print_summary(self, df: pd.DataFrame) -> None:
         self.logger.info("\n" + "="*50)
@@ -240,13 +247,11 @@ class CostOfLivingScraper:
         self.logger.info(f"Data points per country: {len(df.columns)}")
         
         if "Cost_of_Living_Index" in df.columns:
-            avg_col = df["Cost_of_Living_Index"].replace("N/A", np.nan).astype(float).mean()
+            avg_col = df["Cost_of_Living_Index"].mean()
             self.logger.info(f"Average Cost of Living Index: {avg_col:.2f}")
             
         if "Cost_of_Living_Index" in df.columns:
-            # Ensure "Cost_of_Living_Index" is numeric for sorting
-            df_numeric_col = df[df["Cost_of_Living_Index"] != "N/A"].copy()
-            df_numeric_col["Cost_of_Living_Index"] = pd.to_numeric(df_numeric_col["Cost_of_Living_Index"])
+            df_numeric_col = df.dropna(subset=["Cost_of_Living_Index"])
             
             if not df_numeric_col.empty:
                 top_expensive = df_numeric_col.nlargest(5, "Cost_of_Living_Index")["Country"].tolist()
@@ -279,7 +284,10 @@ COUNTRIES_LIST: List[str] = [
 ]
 
 def main() -> None:
-    scraper = CostOfLivingScraper(headless=False, delay_range=(3, 6))
+    scraper = CostOfLivingScraper(
+        headless=False, delay_range=(3, 6), lean=True,
+        profile_dir=os.path.expanduser("~/.cache/bagragi/cost-of-living-profile")
+    )
     try:
         scraper.scrape_numbeo_data(COUNTRIES_LIST)
         scraper.scrape_alternative_sources(COUNTRIES_LIST)
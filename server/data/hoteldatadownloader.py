@@ -1,32 +1,45 @@
-import time
-import random
-import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 import logging
 from datetime import datetime, timedelta
-import json
 import os
+from itertools import islice
+
+from browser import PageLoadMonitor, create_chrome_driver
+from hoteldedup import HotelDeduplicator
+from records import HotelRecord, hotels_to_frame, intern_text, parse_number, write_json
+from ratecontroller import AdaptiveRateController
+from replay import PageRecorder
+from runreport import RunProfiler, report_path_for
 
 class EnhancedHotelScraper:
-    def __init__(self, headless=True, delay_range=(2, 5)):
+    RESULTS_PER_PAGE = 25
+
+    def __init__(self, headless=True, delay_range=(2, 5), lean=False, profile_dir=None,
+                 record_dir=None, driver=None):
         """
         Initialize the scraper with enhanced configurations
         
         Args:
             headless (bool): Run browser in headless mode
-            delay_range (tuple): Range for random delays between requests
+            delay_range (tuple): Starting range for delays between requests, adapted during the run
+            lean (bool): Block images, media and trackers and use an eager page-load strategy
+            profile_dir (str): Browser profile directory reused across runs
+            record_dir (str): Save raw page HTML here for offline replay
+            driver: Existing driver to use instead of launching Chrome (e.g. replay.ReplayDriver)
         """
         self.setup_logging()
         self.delay_range = delay_range
-        self.driver = self.setup_driver(headless)
+        self.rate_controller = AdaptiveRateController(delay_range, logger=self.logger)
+        self.page_monitor = PageLoadMonitor("lean" if lean else "full", logger=self.logger)
+        self.profiler = RunProfiler(record_label="hotels", logger=self.logger)
+        self.recorder = PageRecorder(record_dir) if record_dir else None
+        self.driver = driver or self.setup_driver(headless, lean, profile_dir)
         self.hotels_data = []
+        self.deduplicator = HotelDeduplicator()
+        self.page_progress = {}
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -40,30 +53,14 @@ class EnhancedHotelScraper:
         )
         self.logger = logging.getLogger(__name__)
         
-    def setup_driver(self, headless=True):
+    def setup_driver(self, headless=True, lean=False, profile_dir=None):
         """Setup Chrome driver with optimal configurations"""
-        options = Options()
-        
-        if headless:
-            options.add_argument('--headless')
-            
-        # Anti-detection measures
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        return create_chrome_driver(headless, lean=lean, profile_dir=profile_dir)
         
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        return driver
-        
-    def random_delay(self):
-        """Add random delay to avoid detection"""
-        delay = random.uniform(*self.delay_range)
-        time.sleep(delay)
+    def throttle(self):
+        """Pause between requests at the pace set by the rate controller"""
+        with self.profiler.phase("sleep"):
+            self.rate_controller.wait()
         
     def get_checkin_checkout_dates(self, days_ahead=30, stay_duration=2):
         """Generate check-in and check-out dates"""
@@ -72,7 +69,7 @@ class EnhancedHotelScraper:
         
         return checkin.strftime('%Y-%m-%d'), checkout.strftime('%Y-%m-%d')
         
-    def scrape_hotels_from_city(self, city, country, currency="USD", target_hotels=100):
+    def scrape_hotels_from_city(self, city, country, currency="USD", target_hotels=100, start_page=1):
         """
         Scrape hotels from a specific city with pagination support
         
@@ -81,11 +78,13 @@ class EnhancedHotelScraper:
             country (str): Country name
             currency (str): Currency code
             target_hotels (int): Target number of hotels to scrape
+            start_page (int): Results page to start from (used to resume a city)
             
         Returns:
-            list: List of hotel dictionaries
+            list: HotelRecords not seen earlier in this run
         """
-        self.logger.info(f"Starting to scrape hotels from {city}, {country}")
+        self.logger.info(f"Starting to scrape hotels from {city}, {country} (page {start_page})")
+        self.profiler.set_context(country=country, city=city, page=start_page)
         
         checkin, checkout = self.get_checkin_checkout_dates()
         
@@ -100,64 +99,99 @@ class EnhancedHotelScraper:
             'no_rooms': '1',
             'selected_currency': currency
         }
+        if start_page > 1:
+            params['offset'] = str((start_page - 1) * self.RESULTS_PER_PAGE)
         
         url = f"{base_url}?" + "&".join([f"{k}={v}" for k, v in params.items()])
         
         try:
-            self.driver.get(url)
-            self.random_delay()
+            with self.profiler.phase("navigation"), self.rate_controller.track():
+                self.driver.get(url)
+            self.throttle()
             
             # Handle cookie consent if present
             self.handle_cookie_consent()
             
             city_hotels = []
-            page_num = 1
+            page_num = start_page
             consecutive_empty_pages = 0
+            progress = {"next_page": start_page, "exhausted": False}
+            self.page_progress[(country, city)] = progress
             
             while len(city_hotels) < target_hotels and consecutive_empty_pages < 3:
                 self.logger.info(f"Scraping page {page_num} for {city}, {country} - Found {len(city_hotels)} hotels so far")
+                self.profiler.set_context(page=page_num)
+                self.profiler.count("pages")
                 
                 # Wait for hotels to load
                 try:
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="property-card"]'))
-                    )
+                    with self.profiler.phase("wait_for_cards"), self.rate_controller.track():
+                        WebDriverWait(self.driver, 10).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="property-card"]'))
+                        )
                 except TimeoutException:
                     self.logger.warning(f"No hotels found on page {page_num} for {city}")
+                    self.page_monitor.record(self.driver, f"{city} p{page_num}")
                     consecutive_empty_pages += 1
                     if not self.go_to_next_page():
+                        progress["exhausted"] = True
                         break
+                    page_num += 1
+                    progress["next_page"] = page_num
+                    self.throttle()
                     continue
                 
+                self.page_monitor.record(self.driver, f"{city} p{page_num}")
+                
                 # Extract hotels from current page
-                page_hotels = self.extract_hotels_from_page(city, country, currency)
+                with self.profiler.phase("extraction"):
+                    page_hotels = self.extract_hotels_from_page(city, country, currency)
+                if self.recorder:
+                    self.recorder.save(
+                        self.driver, "hotels", f"{country}__{city}__p{page_num}",
+                        country=country, city=city, currency=currency, page=page_num,
+                        records=len(page_hotels)
+                    )
+                
+                # Drop hotels already collected this run. Only hotels we keep are
+                # registered, so a page cut short by the target can be resumed.
+                remaining = target_hotels - len(city_hotels)
+                new_hotels = list(islice(self.deduplicator.filter(page_hotels), remaining))
                 
                 if not page_hotels:
                     consecutive_empty_pages += 1
                     self.logger.warning(f"No hotels extracted from page {page_num}")
+                elif not new_hotels:
+                    consecutive_empty_pages += 1
+                    self.logger.warning(f"Only duplicate hotels on page {page_num}")
                 else:
                     consecutive_empty_pages = 0
-                    city_hotels.extend(page_hotels)
-                    self.logger.info(f"Extracted {len(page_hotels)} hotels from page {page_num}")
+                    city_hotels.extend(new_hotels)
+                    self.profiler.count("hotels", len(new_hotels))
+                    self.logger.info(f"Extracted {len(new_hotels)} new hotels from page {page_num}")
                 
                 # Check if we have enough hotels
                 if len(city_hotels) >= target_hotels:
-                    city_hotels = city_hotels[:target_hotels]
+                    # Resume from this page if it still holds hotels we didn't take
+                    progress["next_page"] = page_num if len(new_hotels) == remaining else page_num + 1
                     break
                 
                 # Go to next page
                 if not self.go_to_next_page():
                     self.logger.info(f"No more pages available for {city}")
+                    progress["exhausted"] = True
                     break
                     
                 page_num += 1
-                self.random_delay()
+                progress["next_page"] = page_num
+                self.throttle()
                 
             self.logger.info(f"Completed scraping {city}, {country}. Total hotels found: {len(city_hotels)}")
             return city_hotels
             
         except Exception as e:
             self.logger.error(f"Error scraping {city}, {country}: {str(e)}")
+            self.profiler.count("city_failures")
             return []
             
     def handle_cookie_consent(self):
@@ -219,41 +253,40 @@ class EnhancedHotelScraper:
             # Property type
             property_type = self.safe_extract_text(element, '[data-testid="property-type-badge"]')
             
-            return {
-                "Country": country,
-                "City/Place": city,
-                "Hotel Name": name,
-                "Stars": stars,
-                "Rating": rating,
-                "Number of Reviews": reviews,
-                "Property Type": property_type,
-                "Location": location,
-                "Distance from Center": distance,
-                "Avg Price per Night (USD)": price,
-                "Currency": currency,
-                "Amenities": amenities,
-                "Scraped Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            return HotelRecord(
+                country=intern_text(country),
+                city=intern_text(city),
+                name=name,
+                stars=stars,
+                rating=rating,
+                reviews=reviews,
+                property_type=intern_text(property_type),
+                location=location,
+                distance=distance,
+                price=price,
+                currency=intern_text(currency),
+                amenities=intern_text(amenities),
+                scraped_date=intern_text(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
             
         except Exception as e:
             self.logger.debug(f"Error extracting hotel data: {str(e)}")
             return None
             
     def safe_extract_text(self, element, selector):
-        """Safely extract text from element"""
+        """Safely extract text from element; None if it is missing or empty"""
         try:
-            return element.find_element(By.CSS_SELECTOR, selector).text.strip()
+            return element.find_element(By.CSS_SELECTOR, selector).text.strip() or None
         except:
-            return "N/A"
+            return None
             
     def extract_star_rating(self, element):
-        """Extract star rating"""
+        """Extract star rating as a number"""
         try:
             star_element = element.find_element(By.CSS_SELECTOR, '[aria-label*="out of 5"]')
-            aria_label = star_element.get_attribute("aria-label")
-            return aria_label.split()[0] if aria_label else "N/A"
+            return parse_number(star_element.get_attribute("aria-label"))
         except:
-            return "N/A"
+            return None
             
     def extract_price(self, element):
         """Extract and clean price information"""
@@ -268,28 +301,26 @@ class EnhancedHotelScraper:
                 # Adjust for currency formatting (assuming cents)
                 if price > 1000:
                     price = price / 100
-                return price
-            return "N/A"
+                return float(price)
+            return None
         except:
-            return "N/A"
+            return None
             
     def extract_rating_and_reviews(self, element):
-        """Extract rating and number of reviews"""
+        """Extract rating and number of reviews as numbers"""
         try:
             rating_element = element.find_element(By.CSS_SELECTOR, '[data-testid="review-score"]')
-            rating_text = rating_element.text
             
-            # Extract rating (usually first number)
-            rating_parts = rating_text.split()
-            rating = rating_parts[0] if rating_parts else "N/A"
+            # The score is the first number ("Scored 8.4 ...")
+            rating = parse_number(rating_element.text)
             
             # Extract number of reviews
             reviews_text = self.safe_extract_text(element, '[data-testid="review-score"] + *')
-            reviews = ''.join(filter(str.isdigit, reviews_text)) if reviews_text != "N/A" else "N/A"
+            reviews = parse_number(reviews_text)
             
-            return rating, reviews
+            return rating, None if reviews is None else int(reviews)
         except:
-            return "N/A", "N/A"
+            return None, None
             
     def extract_amenities(self, element):
         """Extract amenities/facilities"""
@@ -302,21 +333,22 @@ class EnhancedHotelScraper:
                 if amenity_text:
                     amenities.append(amenity_text)
                     
-            return ", ".join(amenities) if amenities else "N/A"
+            return ", ".join(amenities) if amenities else None
         except:
-            return "N/A"
+            return None
             
     def go_to_next_page(self):
-        """Navigate to next page"""
-        try:
-            next_button = self.driver.find_element(By.CSS_SELECTOR, '[aria-label="Next page"]')
-            if next_button.is_enabled():
-                self.driver.execute_script("arguments[0].click();", next_button)
-                self.random_delay()
-                return True
-            return False
-        except:
-            return False
+        """Navigate to next page (the caller pauses afterwards)"""
+        with self.profiler.phase("pagination"):
+            try:
+                next_button = self.driver.find_element(By.CSS_SELECTOR, '[aria-label="Next page"]')
+                if next_button.is_enabled():
+                    self.driver.execute_script("arguments[0].click();", next_button)
+                    return True
+                return False
+            except:
+                self.profiler.count("pagination_failures")
+                return False
             
     def scrape_multiple_cities(self, cities_data, hotels_per_country=100):
         """
@@ -327,9 +359,14 @@ class EnhancedHotelScraper:
             hotels_per_country (int): Target hotels per country
             
         Returns:
-            list: Combined hotel data
+            list: Combined HotelRecords
         """
         all_hotels = []
+        self.deduplicator.reset()
+        self.page_progress.clear()
+        self.rate_controller.reset()
+        self.page_monitor.pages.clear()
+        self.profiler.reset()
         
         for item in cities_data:
             if isinstance(item, tuple) and len(item) == 2:
@@ -351,45 +388,71 @@ class EnhancedHotelScraper:
                         
                         # Add delay between cities
                         if len(cities) > 1:
-                            self.random_delay()
+                            self.throttle()
                             
                     except Exception as e:
                         self.logger.error(f"Error scraping {city}, {country}: {str(e)}")
+                        self.profiler.count("city_failures")
                         continue
                 
-                # If we didn't get enough hotels, try to get more from the first city
+                # If we didn't get enough hotels, try to get more from the first city,
+                # resuming where the first pass stopped instead of starting over
                 if len(country_hotels) < hotels_per_country and cities:
                     additional_needed = hotels_per_country - len(country_hotels)
-                    additional_hotels = self.scrape_hotels_from_city(
-                        cities[0], country, target_hotels=additional_needed
-                    )
-                    country_hotels.extend(additional_hotels)
+                    progress = self.page_progress.get((country, cities[0]), {"next_page": 1, "exhausted": False})
+                    if progress["exhausted"]:
+                        self.logger.info(f"No more pages left for {cities[0]}, skipping top-up for {country}")
+                    else:
+                        additional_hotels = self.scrape_hotels_from_city(
+                            cities[0], country, target_hotels=additional_needed,
+                            start_page=progress["next_page"]
+                        )
+                        country_hotels.extend(additional_hotels)
                 
                 all_hotels.extend(country_hotels[:hotels_per_country])
                 self.logger.info(f"Completed {country}: {len(country_hotels)} hotels")
                 
+        self.log_dedup_report()
+        self.rate_controller.log_report()
+        self.page_monitor.log_report()
         return all_hotels
         
+    def log_dedup_report(self):
+        """Log how many duplicate hotels were dropped during this run"""
+        report = self.deduplicator.report()
+        self.logger.info(
+            f"Deduplication: {report['duplicates_dropped']} duplicates dropped out of "
+            f"{report['records_seen']} hotels seen ({report['duplicate_rate']:.1%} duplicate rate)"
+        )
+        
     def save_data(self, data, filename="enhanced_hotels_dataset.csv", save_json=True):
-        """Save scraped data to CSV and optionally JSON"""
+        """Save scraped HotelRecords to CSV and optionally JSON; missing values are left empty/null"""
         if not data:
             self.logger.warning("No data to save")
             return
             
         # Save to CSV
-        df = pd.DataFrame(data)
+        df = hotels_to_frame(data)
         df.to_csv(filename, index=False)
         self.logger.info(f"Data saved to {filename}")
         
         # Save to JSON as backup
         if save_json:
             json_filename = filename.replace('.csv', '.json')
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_json(df, json_filename)
             self.logger.info(f"Data also saved to {json_filename}")
             
         # Print summary
         self.print_summary(df)
+        self.write_run_report(filename)
+        
+    def write_run_report(self, filename):
+        """Write the machine-readable run report next to the dataset"""
+        self.profiler.write(report_path_for(filename), extra={
+            "dedup": self.deduplicator.report(),
+            "pacing": self.rate_controller.report(),
+            "page_loads": self.page_monitor.report(),
+        })
         
     def print_summary(self, df):
         """Print summary of scraped data"""
@@ -649,7 +712,10 @@ def main():
 
     
     # Initialize scraper
-    scraper = EnhancedHotelScraper(headless=False, delay_range=(3, 7))
+    scraper = EnhancedHotelScraper(
+        headless=False, delay_range=(3, 7), lean=True,
+        profile_dir=os.path.expanduser("~/.cache/bagragi/hotel-scraper-profile")
+    )
     
     try:
         # Scrape hotels (100 per country)
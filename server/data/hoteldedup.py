@@ -0,0 +1,68 @@
+import hashlib
+import re
+import unicodedata
+
+
+def normalize_text(value):
+    """Fold case, accents, punctuation and whitespace so near-identical strings compare equal"""
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^\w\s]", " ", text.casefold())
+    return " ".join(text.split())
+
+
+class HotelDeduplicator:
+    """
+    Streaming deduplication stage for scraped hotel records
+
+    Records are keyed by a normalized (country, city, hotel name, address) tuple.
+    Only a 64-bit digest of each key is kept, so memory stays small on long runs.
+    """
+
+    KEY_FIELDS = ("Country", "City/Place", "Hotel Name", "Location")
+
+    def __init__(self):
+        self.seen = set()
+        self.total = 0
+        self.duplicates = 0
+
+    def key_hash(self, record):
+        """Return the 64-bit digest of a record's normalized identity key"""
+        key = "\x1f".join(normalize_text(record.get(field)) for field in self.KEY_FIELDS)
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, record):
+        """Register a record, returning False if it was already seen"""
+        self.total += 1
+        digest = self.key_hash(record)
+        if digest in self.seen:
+            self.duplicates += 1
+            return False
+        self.seen.add(digest)
+        return True
+
+    def filter(self, records):
+        """Yield only records that have not been seen before"""
+        for record in records:
+            if self.add(record):
+                yield record
+
+    @property
+    def duplicate_rate(self):
+        return self.duplicates / self.total if self.total else 0.0
+
+    def report(self):
+        """Return run statistics for logging"""
+        return {
+            "records_seen": self.total,
+            "unique_records": len(self.seen),
+            "duplicates_dropped": self.duplicates,
+            "duplicate_rate": round(self.duplicate_rate, 4),
+        }
+
+    def reset(self):
+        self.seen.clear()
+        self.total = 0
+        self.duplicates = 0
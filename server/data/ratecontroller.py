@@ -0,0 +1,123 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+
+class AdaptiveRateController:
+    """
+    Shared pacing for the scrapers
+
+    Replaces fixed random sleeps with a delay that shrinks while the site answers
+    quickly and grows when responses slow down or time out. Consecutive failures
+    back off exponentially. Time spent sleeping versus working is tracked per run.
+    """
+
+    def __init__(self, delay_range=(2, 5), min_delay=1.0, max_delay=60.0,
+                 slow_response=4.0, smoothing=0.3, logger=None):
+        """
+        Args:
+            delay_range (tuple): Starting delay range; its spread is kept as jitter
+            min_delay (float): Lowest delay reached while the site responds quickly
+            max_delay (float): Upper bound for delay and backoff
+            slow_response (float): Average response time (s) above which we slow down
+            smoothing (float): Weight of the latest sample in the response time average
+        """
+        low, high = delay_range
+        self.jitter = high / low if low > 0 else 1.0
+        self.initial_delay = float(low)
+        self.min_delay = min(min_delay, self.initial_delay)
+        self.max_delay = max_delay
+        self.slow_response = slow_response
+        self.smoothing = smoothing
+        self.logger = logger or logging.getLogger(__name__)
+        self.reset()
+
+    def reset(self):
+        """Start a new run with fresh statistics"""
+        self.delay = self.initial_delay
+        self.avg_response = None
+        self.consecutive_failures = 0
+        self.started = time.monotonic()
+        self.sleep_time = 0.0
+        self.sleeps = 0
+        self.responses = 0
+        self.failures = 0
+
+    def record_response(self, seconds):
+        """Feed a successful response time into the controller"""
+        self.responses += 1
+        self.consecutive_failures = 0
+        if self.avg_response is None:
+            self.avg_response = seconds
+        else:
+            self.avg_response += self.smoothing * (seconds - self.avg_response)
+
+        if self.avg_response > self.slow_response:
+            self.delay = min(self.max_delay, self.delay * 1.5)
+        else:
+            self.delay = max(self.min_delay, self.delay * 0.85)
+
+    def record_failure(self):
+        """Register a timeout or failed request"""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.delay = min(self.max_delay, self.delay * 1.5)
+
+    @contextmanager
+    def track(self):
+        """Time a request, counting any exception raised inside as a failure"""
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_response(time.monotonic() - start)
+
+    def next_delay(self):
+        """Delay for the next pause, including exponential backoff and jitter"""
+        base = self.delay
+        if self.consecutive_failures:
+            base = min(self.max_delay, base * 2 ** self.consecutive_failures)
+        return random.uniform(base, min(self.max_delay, base * self.jitter))
+
+    def wait(self):
+        """Sleep for the current delay"""
+        delay = self.next_delay()
+        time.sleep(delay)
+        self.sleep_time += delay
+        self.sleeps += 1
+        return delay
+
+    @property
+    def failure_rate(self):
+        attempts = self.responses + self.failures
+        return self.failures / attempts if attempts else 0.0
+
+    def report(self):
+        """Return pacing statistics for the current run"""
+        elapsed = time.monotonic() - self.started
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "sleep_seconds": round(self.sleep_time, 2),
+            "work_seconds": round(max(0.0, elapsed - self.sleep_time), 2),
+            "sleep_share": round(self.sleep_time / elapsed, 4) if elapsed else 0.0,
+            "sleeps": self.sleeps,
+            "responses": self.responses,
+            "failures": self.failures,
+            "failure_rate": round(self.failure_rate, 4),
+            "avg_response_seconds": round(self.avg_response, 3) if self.avg_response is not None else None,
+            "current_delay_seconds": round(self.delay, 2),
+        }
+
+    def log_report(self):
+        """Log time spent sleeping versus working"""
+        report = self.report()
+        self.logger.info(
+            f"Pacing: {report['sleep_seconds']}s sleeping vs {report['work_seconds']}s working "
+            f"({report['sleep_share']:.1%} idle), {report['responses']} responses, "
+            f"{report['failures']} failures ({report['failure_rate']:.1%}), "
+            f"final delay {report['current_delay_seconds']}s"
+        )
+        return report
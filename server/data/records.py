@@ -0,0 +1,162 @@
+"""
+Compact record types for scraped hotels and cost-of-living rows
+
+A scraper run keeps every record in memory until it saves, so records are
+slotted dataclasses instead of dicts: numbers are parsed once at extraction,
+strings that repeat across records (country, city, currency, timestamps) are
+interned, and missing values are None rather than "N/A". Records become
+columns only when the run is saved.
+"""
+import json
+import math
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+
+import pandas as pd
+
+MISSING_TEXT = {"", "N/A", "NA"}
+
+_NUMBER = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?")
+
+
+def intern_text(value):
+    """Stripped, interned text; None for empty or "N/A" values"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if text.upper() in MISSING_TEXT:
+        return None
+    return sys.intern(text)
+
+
+def parse_number(value):
+    """First number in a scraped string ("Scored 8.4", "1,234 reviews") as a float, or None"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+    match = _NUMBER.search(str(value))
+    return float(match.group().replace(",", "")) if match else None
+
+
+def write_json(frame, path):
+    """Save a dataset frame as a JSON list of row objects, with null for missing values"""
+    rows = frame.astype(object).where(frame.notna(), None).to_dict("records")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+# --------- HOTELS ---------
+# Dataset column -> HotelRecord field
+HOTEL_COLUMNS = {
+    "Country": "country",
+    "City/Place": "city",
+    "Hotel Name": "name",
+    "Stars": "stars",
+    "Rating": "rating",
+    "Number of Reviews": "reviews",
+    "Property Type": "property_type",
+    "Location": "location",
+    "Distance from Center": "distance",
+    "Avg Price per Night (USD)": "price",
+    "Currency": "currency",
+    "Amenities": "amenities",
+    "Scraped Date": "scraped_date",
+}
+
+
+@dataclass(slots=True)
+class HotelRecord:
+    country: str
+    city: str
+    name: str
+    stars: float | None = None
+    rating: float | None = None
+    reviews: int | None = None
+    property_type: str | None = None
+    location: str | None = None
+    distance: str | None = None
+    price: float | None = None
+    currency: str = "USD"
+    amenities: str | None = None
+    scraped_date: str | None = None
+
+    def get(self, column, default=None):
+        """Value by dataset column name, so dict-based stages (dedup) work unchanged"""
+        value = getattr(self, HOTEL_COLUMNS[column])
+        return default if value is None else value
+
+
+def hotels_to_frame(records):
+    """Dataset frame with one column per HOTEL_COLUMNS entry, built column by column"""
+    frame = pd.DataFrame({
+        column: [getattr(record, field) for record in records] for column, field in HOTEL_COLUMNS.items()
+    })
+    frame["Number of Reviews"] = frame["Number of Reviews"].astype("Int64")
+    return frame
+
+
+# --------- COST OF LIVING ---------
+INDEX_COLUMNS = [
+    "Cost_of_Living_Index", "Rent_Index", "Cost_of_Living_Plus_Rent_Index", "Groceries_Index",
+    "Restaurant_Price_Index", "Local_Purchasing_Power_Index",
+]
+PRICE_COLUMNS = [
+    "Meal_Inexpensive_Restaurant_USD", "Meal_for_2_Mid_Range_Restaurant_USD", "McMeal_at_McDonalds_USD",
+    "Domestic_Beer_0_5L_USD", "Imported_Beer_0_33L_USD", "Cappuccino_USD", "Coke_0_33L_USD", "Water_0_33L_USD",
+    "Milk_1L_USD", "Bread_500g_USD", "Rice_1kg_USD", "Eggs_12_USD", "Cheese_1kg_USD", "Chicken_Fillets_1kg_USD",
+    "Beef_Round_1kg_USD", "Apples_1kg_USD", "Banana_1kg_USD", "Oranges_1kg_USD", "Tomato_1kg_USD",
+    "Potato_1kg_USD", "Onion_1kg_USD", "Lettuce_1head_USD", "Water_1_5L_USD", "Bottle_of_Wine_Mid_Range_USD",
+    "Domestic_Beer_0_5L_Market_USD", "Imported_Beer_0_33L_Market_USD", "Cigarettes_20_Pack_USD",
+    "One_way_Ticket_Local_Transport_USD", "Monthly_Pass_Regular_Price_USD", "Taxi_Start_Normal_Tariff_USD",
+    "Taxi_1km_Normal_Tariff_USD", "Taxi_1hour_Waiting_USD", "Gasoline_1L_USD", "Volkswagen_Golf_1_4_90_KW_USD",
+    "Apartment_1_Bedroom_City_Centre_USD", "Apartment_1_Bedroom_Outside_Centre_USD",
+    "Apartment_3_Bedrooms_City_Centre_USD", "Apartment_3_Bedrooms_Outside_Centre_USD", "Basic_Utilities_85m2_USD",
+    "1_min_Prepaid_Mobile_Tariff_USD", "Internet_60_Mbps_USD", "Fitness_Club_Monthly_Fee_USD",
+    "Tennis_Court_Rent_1_Hour_USD", "Cinema_International_Release_USD", "Preschool_Private_Monthly_USD",
+    "International_Primary_School_Yearly_USD",
+]
+INDICATOR_COLUMNS = [
+    "GDP_Per_Capita_USD", "Inflation_Rate_Percent", "Unemployment_Rate_Percent", "Average_Monthly_Salary_USD",
+    "Minimum_Wage_USD",
+]
+COST_OF_LIVING_COLUMNS = INDEX_COLUMNS + PRICE_COLUMNS + INDICATOR_COLUMNS
+_COST_POSITIONS = {column: i for i, column in enumerate(COST_OF_LIVING_COLUMNS)}
+
+
+@dataclass(slots=True)
+class CostOfLivingRecord:
+    """One country's values as doubles in COST_OF_LIVING_COLUMNS order, NaN where missing"""
+    country: str
+    scraped_date: str
+    source: str
+    values: array
+
+    @classmethod
+    def empty(cls, country, scraped_date, source="Numbeo"):
+        return cls(intern_text(country), intern_text(scraped_date), intern_text(source),
+                   array("d", [math.nan]) * len(COST_OF_LIVING_COLUMNS))
+
+    def set(self, column, value):
+        self.values[_COST_POSITIONS[column]] = math.nan if value is None else float(value)
+
+    def get(self, column):
+        value = self.values[_COST_POSITIONS[column]]
+        return None if math.isnan(value) else value
+
+    def update(self, values):
+        for column, value in values.items():
+            self.set(column, value)
+
+
+def cost_of_living_to_frame(records):
+    """Dataset frame: Country, Scraped_Date, Source, then COST_OF_LIVING_COLUMNS"""
+    frame = pd.DataFrame({
+        "Country": [record.country for record in records],
+        "Scraped_Date": [record.scraped_date for record in records],
+        "Source": [record.source for record in records],
+    })
+    values = pd.DataFrame([record.values for record in records], columns=COST_OF_LIVING_COLUMNS, dtype=float)
+    return pd.concat([frame, values], axis=1)
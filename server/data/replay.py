@@ -0,0 +1,206 @@
+"""
+Record/replay harness for the scraper parsers
+
+During a live run, scrapers created with ``record_dir`` save the raw HTML of every
+page they parse plus a manifest line describing it. ``ReplayDriver`` serves that
+HTML through the small part of the WebDriver API the extractors use, so the same
+``extract_*`` methods run offline. Replay needs ``lxml`` and ``cssselect``.
+
+Usage:
+    python replay.py check fixtures/      # re-parse fixtures, flag record count changes
+    python replay.py bench fixtures/ -n 20  # records parsed per second
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+MANIFEST = "manifest.jsonl"
+
+
+class PageRecorder:
+    """Saves page HTML and a manifest entry for later replay"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, driver, kind, name, **meta):
+        """Write the driver's current page source under ``kind/name.html``"""
+        relative = os.path.join(kind, re.sub(r"[^\w.-]+", "_", name) + ".html")
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+        with open(os.path.join(self.root, MANIFEST), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"kind": kind, "file": relative, **meta}, ensure_ascii=False) + "\n")
+        return path
+
+
+@lru_cache(maxsize=256)
+def _css(selector):
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(selector)
+
+
+def _find_all(node, by, value):
+    if by == By.CSS_SELECTOR:
+        return _css(value)(node)
+    if by == By.XPATH:
+        return [n for n in node.xpath(value) if hasattr(n, "tag")]
+    if by == By.CLASS_NAME:
+        return _css(f".{value}")(node)
+    if by == By.ID:
+        return _css(f"#{value}")(node)
+    if by == By.TAG_NAME:
+        return list(node.iter(value))
+    raise ValueError(f"Locator strategy not supported in replay: {by}")
+
+
+class ReplayElement:
+    """Read-only stand-in for a WebElement backed by an lxml node"""
+
+    def __init__(self, node):
+        self.node = node
+
+    def find_element(self, by, value):
+        found = _find_all(self.node, by, value)
+        if not found:
+            raise NoSuchElementException(f"{by}={value}")
+        return ReplayElement(found[0])
+
+    def find_elements(self, by, value):
+        return [ReplayElement(n) for n in _find_all(self.node, by, value)]
+
+    @property
+    def text(self):
+        return "\n".join(t.strip() for t in self.node.itertext() if t.strip())
+
+    def get_attribute(self, name):
+        return self.node.get(name)
+
+    def is_enabled(self):
+        return self.node.get("disabled") is None
+
+    def click(self):
+        pass
+
+
+class ReplayDriver(ReplayElement):
+    """Driver-free page: supports element lookup, waits and page_source"""
+
+    def __init__(self, html):
+        import lxml.html
+        self.page_source = html
+        super().__init__(lxml.html.document_fromstring(html))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(f.read())
+
+    def execute_script(self, script, *args):
+        return None
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+def load_manifest(root):
+    """Return fixture entries, keeping only the latest recording of each file"""
+    entries = {}
+    with open(os.path.join(root, MANIFEST), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries[entry["file"]] = entry
+    return list(entries.values())
+
+
+def build_scrapers():
+    """Scrapers wired to a placeholder driver, so no browser is launched"""
+    from costoflivingScraper import CostOfLivingScraper
+    from hoteldatadownloader import EnhancedHotelScraper
+
+    placeholder = ReplayDriver("<html></html>")
+    return {
+        "hotels": EnhancedHotelScraper(driver=placeholder),
+        "cost_of_living": CostOfLivingScraper(driver=placeholder),
+    }
+
+
+def replay_entry(scrapers, root, entry, driver=None):
+    """Run the matching extractor over one fixture and return the parsed records"""
+    scraper = scrapers[entry["kind"]]
+    scraper.driver = driver or ReplayDriver.from_file(os.path.join(root, entry["file"]))
+    if entry["kind"] == "hotels":
+        return scraper.extract_hotels_from_page(entry["city"], entry["country"], entry.get("currency", "USD"))
+    record = scraper.extract_numbeo_data(entry["country"])
+    return [record] if record else []
+
+
+def check(root):
+    """Re-parse every fixture and report record counts that differ from the live run"""
+    scrapers = build_scrapers()
+    regressions = 0
+    for entry in load_manifest(root):
+        parsed = len(replay_entry(scrapers, root, entry))
+        expected = entry.get("records")
+        status = "ok" if expected is None or parsed == expected else "CHANGED"
+        if status != "ok":
+            regressions += 1
+        print(f"{status:8} {entry['file']}: {parsed} records (recorded {expected})")
+    print(f"{regressions} fixture(s) changed")
+    return regressions
+
+
+def bench(root, repeat=10):
+    """Measure records parsed per second for each fixture kind"""
+    scrapers = build_scrapers()
+    entries = load_manifest(root)
+    # Parse HTML up front so the benchmark measures extraction, not file I/O
+    drivers = {e["file"]: ReplayDriver.from_file(os.path.join(root, e["file"])) for e in entries}
+    results = {}
+    for kind in sorted({e["kind"] for e in entries}):
+        kind_entries = [e for e in entries if e["kind"] == kind]
+        records = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for entry in kind_entries:
+                records += len(replay_entry(scrapers, root, entry, drivers[entry["file"]]))
+        elapsed = time.perf_counter() - start
+        results[kind] = {
+            "pages": len(kind_entries) * repeat,
+            "records": records,
+            "seconds": round(elapsed, 4),
+            "records_per_second": round(records / elapsed, 1) if elapsed else None,
+        }
+        print(f"{kind}: {results[kind]}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay of recorded scraper pages")
+    parser.add_argument("command", choices=["check", "bench"])
+    parser.add_argument("fixtures", help="Directory passed as record_dir during a live run")
+    parser.add_argument("-n", "--repeat", type=int, default=10, help="Benchmark iterations")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.command == "check":
+        sys.exit(1 if check(args.fixtures) else 0)
+    bench(args.fixtures, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class RunProfiler:
+    """
+    Structured timing for a scraper run
+
+    Each timed phase (navigation, waiting, extraction, pagination, sleep) becomes
+    an event tagged with the current country/city/page. At the end of a run the
+    events and a summary with throughput and failure counters are appended as
+    JSON lines next to the dataset.
+    """
+
+    def __init__(self, record_label="records", logger=None):
+        self.record_label = record_label
+        self.logger = logger or logging.getLogger(__name__)
+        self.reset()
+
+    def reset(self):
+        """Start a new run"""
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now()
+        self.started = time.monotonic()
+        self.context = {}
+        self.events = []
+        self.counters = Counter()
+
+    def set_context(self, **context):
+        """Tag subsequent events; passing None for a key removes it"""
+        for key, value in context.items():
+            if value is None:
+                self.context.pop(key, None)
+            else:
+                self.context[key] = value
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of work, counting exceptions raised inside as failures"""
+        start = time.monotonic()
+        ok = True
+        try:
+            yield
+        except Exception:
+            ok = False
+            self.counters[f"{name}_failures"] += 1
+            raise
+        finally:
+            self.events.append({
+                "event": "phase",
+                "run_id": self.run_id,
+                "phase": name,
+                "seconds": round(time.monotonic() - start, 4),
+                "ok": ok,
+                **self.context,
+            })
+
+    def count(self, name, amount=1):
+        """Increment a run counter (pages, records, failures...)"""
+        self.counters[name] += amount
+
+    def summary(self):
+        """Aggregate phase timings, throughput and counters for the run"""
+        elapsed = time.monotonic() - self.started
+        minutes = elapsed / 60 if elapsed else 0
+
+        phase_totals = defaultdict(float)
+        per_location = defaultdict(lambda: defaultdict(float))
+        for event in self.events:
+            phase_totals[event["phase"]] += event["seconds"]
+            location = event.get("city") or event.get("country")
+            if location:
+                per_location[location][event["phase"]] += event["seconds"]
+
+        pages = self.counters.get("pages", 0)
+        records = self.counters.get(self.record_label, 0)
+        return {
+            "event": "summary",
+            "run_id": self.run_id,
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed_seconds": round(elapsed, 2),
+            "phase_seconds": {k: round(v, 2) for k, v in phase_totals.items()},
+            "per_location_seconds": {
+                loc: {k: round(v, 2) for k, v in phases.items()} for loc, phases in per_location.items()
+            },
+            "pages": pages,
+            self.record_label: records,
+            "pages_per_minute": round(pages / minutes, 2) if minutes else None,
+            f"{self.record_label}_per_minute": round(records / minutes, 2) if minutes else None,
+            "counters": dict(self.counters),
+        }
+
+    def write(self, path, extra=None):
+        """Append this run's events and summary to a JSON lines file"""
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        with open(path, "a", encoding="utf-8") as f:
+            for event in self.events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        self.logger.info(
+            f"Run report written to {path}: {summary['pages_per_minute']} pages/min, "
+            f"{summary[f'{self.record_label}_per_minute']} {self.record_label}/min"
+        )
+        return summary
+
+
+def report_path_for(dataset_filename):
+    """Run report location next to a dataset file"""
+    return os.path.splitext(dataset_filename)[0] + ".runs.jsonl"